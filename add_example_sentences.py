@@ -2,15 +2,22 @@
 """
 Script to add example sentences to the Dictionary of Obscure Sorrows CSV.
 Uses OpenAI API to generate natural example sentences for each word.
+Large runs are submitted through the Batch API (half cost, separate rate
+limits); small reruns use concurrent realtime requests.
 Saves progress incrementally and skips words that already have sentences.
 """
 
+import asyncio
 import csv
+import hashlib
+import json
 import os
+import random
 import re
-import time
-from openai import OpenAI
-from typing import List, Dict
+import shelve
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError, BadRequestError
+from typing import Iterable, Iterator, List, Dict
 
 # Configuration
 INPUT_CSV = 'obscure_sorrows_dictionary.csv'
@@ -18,41 +25,80 @@ OUTPUT_CSV = 'obscure_sorrows_dictionary_with_sentences.csv'
 SENTENCES_COLUMN = 'Example Sentences'
 NUM_SENTENCES = 3  # Number of example sentences to generate per word
 MODEL = 'gpt-5.1'
+MAX_CONCURRENCY = 20  # Number of OpenAI requests kept in flight at once
+PROMPT_BATCH_SIZE = 20  # Words packed into one prompt to amortize the shared instructions
+BATCH_THRESHOLD = 100  # Use the Batch API when at least this many words are pending
+BATCH_INPUT_JSONL = 'sentence_batch_input.jsonl'
+BATCH_POLL_SECONDS = 60
+MAX_RETRIES = 5  # Attempts per request before giving up on a word
+CACHE_FILE = '.sentence_cache'  # On-disk response cache; reruns skip the API entirely
+
+# Precompiled patterns for response cleanup (hot path: runs once per word)
+_NUM_PREFIX = re.compile(r'^\d+[\.\)]\s*', re.MULTILINE)
+_BULLET_PREFIX = re.compile(r'^[-•]\s*', re.MULTILINE)
+_SENT_SPLIT = re.compile(r'[\.\n]')
+
+_sentence_cache = None
+
+def _get_cache() -> shelve.Shelf:
+    """Open the on-disk response cache lazily (so importing this module has no side effects)."""
+    global _sentence_cache
+    if _sentence_cache is None:
+        _sentence_cache = shelve.open(CACHE_FILE)
+    return _sentence_cache
+
+def _cache_key(word: str, definition: str, num_sentences: int) -> str:
+    """Content-addressed cache key: same model + word + definition hits the same entry."""
+    return hashlib.sha256(f"{MODEL}|{word}|{definition}|{num_sentences}".encode()).hexdigest()
+
+def iter_csv(filename: str) -> Iterator[Dict]:
+    """Stream CSV rows one at a time instead of materializing the whole file."""
+    with open(filename, 'r', encoding='utf-8') as f:
+        reader = csv.DictReader(f)
+        yield from reader
 
 def load_csv(filename: str) -> List[Dict]:
     """Load CSV file and return as list of dictionaries."""
     if not os.path.exists(filename):
         print(f"Error: {filename} not found!")
         return []
-    
-    words = []
-    with open(filename, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            words.append(row)
-    
-    return words
+
+    return list(iter_csv(filename))
+
+CSV_WRITE_BUFFER = 1 << 20  # 1 MiB buffer: a handful of large writes instead of many 8KB ones
+CSV_WRITE_SLAB = 1000  # Rows handed to writerows at a time
 
 def save_csv(words: List[Dict], filename: str):
     """Save words to CSV file."""
     if not words:
         return
-    
+
     # Get all column names
     fieldnames = list(words[0].keys())
-    
-    with open(filename, 'w', newline='', encoding='utf-8') as f:
+
+    with open(filename, 'w', newline='', encoding='utf-8', buffering=CSV_WRITE_BUFFER) as f:
         writer = csv.DictWriter(f, fieldnames=fieldnames)
         writer.writeheader()
-        writer.writerows(words)
-    
+        for start in range(0, len(words), CSV_WRITE_SLAB):
+            writer.writerows(words[start:start + CSV_WRITE_SLAB])
+
     print(f"  Saved progress to {filename}")
 
-def get_example_sentences(client: OpenAI, word: str, definition: str, num_sentences: int = 3) -> str:
-    """
-    Use OpenAI API to generate example sentences for a word.
-    Returns a semicolon-separated string of sentences.
-    """
+def load_checkpoints(checkpoint_file: str) -> Dict[str, Dict]:
+    """Load per-word checkpoints from the append-only JSONL file."""
+    checkpoints = {}
+    if os.path.exists(checkpoint_file):
+        with open(checkpoint_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    word = json.loads(line)
+                    if word.get('Word'):
+                        checkpoints[word['Word']] = word
+    return checkpoints
+
+def build_messages(word: str, definition: str, num_sentences: int) -> List[Dict]:
+    """Build the chat messages used to generate sentences for a word."""
     prompt = f"""Generate {num_sentences} natural, conversational example sentences using the word "{word}".
 
 IMPORTANT REQUIREMENTS:
@@ -70,124 +116,348 @@ Definition: {definition} (provided for context only - do not include in sentence
 
 Generate {num_sentences} example sentences in English:"""
 
+    return [
+        {"role": "system", "content": "You are a helpful assistant that generates natural example sentences for words."},
+        {"role": "user", "content": prompt}
+    ]
+
+def clean_sentences(sentences: str, num_sentences: int) -> str:
+    """Clean up a model response into a semicolon-separated sentence string."""
+    sentences = sentences.strip()
+
+    # Clean up the response - remove any numbering, bullets, or extra formatting
+    sentences = sentences.replace('\n', ' ')
+    # Remove common prefixes like "1.", "2.", "-", etc.
+    sentences = _NUM_PREFIX.sub('', sentences)
+    sentences = _BULLET_PREFIX.sub('', sentences)
+
+    # Split by semicolon if present, otherwise try other separators
+    if ';' in sentences:
+        sentence_list = [s.strip() for s in sentences.split(';') if s.strip()]
+    else:
+        # Try to split by periods or newlines
+        sentence_list = [s.strip() for s in _SENT_SPLIT.split(sentences) if s.strip() and len(s.strip()) > 10]
+
+    # Limit to requested number
+    sentence_list = sentence_list[:num_sentences]
+
+    # Join with semicolon and space
+    return '; '.join(sentence_list)
+
+async def create_with_retry(client: AsyncOpenAI, **kwargs):
+    """Call chat.completions.create, retrying transient failures with jittered backoff.
+
+    Rate limits, timeouts, and 5xx responses are worth retrying;
+    BadRequestError is permanent and re-raised immediately.
+    """
+    for attempt in range(MAX_RETRIES):
+        try:
+            return await client.chat.completions.create(**kwargs)
+        except BadRequestError:
+            raise
+        except (APITimeoutError, APIConnectionError, APIStatusError) as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            delay = (2 ** attempt) + random.random()
+            print(f"    Transient API error ({type(e).__name__}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+async def get_example_sentences(client: AsyncOpenAI, word: str, definition: str, num_sentences: int = 3) -> str:
+    """
+    Use OpenAI API to generate example sentences for a word.
+    Returns a semicolon-separated string of sentences.
+    """
+    cache = _get_cache()
+    key = _cache_key(word, definition, num_sentences)
+    if key in cache:
+        return cache[key]
+
     try:
-        response = client.chat.completions.create(
+        response = await create_with_retry(
+            client,
             model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are a helpful assistant that generates natural example sentences for words."},
-                {"role": "user", "content": prompt}
-            ],
+            messages=build_messages(word, definition, num_sentences),
             temperature=0.7,
             max_completion_tokens=300
         )
-        
-        sentences = response.choices[0].message.content.strip()
-        
-        # Clean up the response - remove any numbering, bullets, or extra formatting
-        sentences = sentences.replace('\n', ' ')
-        # Remove common prefixes like "1.", "2.", "-", etc.
-        sentences = re.sub(r'^\d+[\.\)]\s*', '', sentences, flags=re.MULTILINE)
-        sentences = re.sub(r'^[-•]\s*', '', sentences, flags=re.MULTILINE)
-        
-        # Split by semicolon if present, otherwise try other separators
-        if ';' in sentences:
-            sentence_list = [s.strip() for s in sentences.split(';') if s.strip()]
-        else:
-            # Try to split by periods or newlines
-            sentence_list = [s.strip() for s in re.split(r'[\.\n]', sentences) if s.strip() and len(s.strip()) > 10]
-        
-        # Limit to requested number
-        sentence_list = sentence_list[:num_sentences]
-        
-        # Join with semicolon and space
-        return '; '.join(sentence_list)
-    
+
+        sentences = clean_sentences(response.choices[0].message.content, num_sentences)
+        if sentences:
+            cache[key] = sentences
+        return sentences
+
     except Exception as e:
         print(f"    Error generating sentences: {e}")
         return ""
 
-def process_words(words: List[Dict], api_key: str, output_file: str):
+def build_multi_word_messages(items: List[tuple], num_sentences: int) -> List[Dict]:
+    """Build chat messages asking for sentences for several words at once."""
+    word_lines = '\n'.join(
+        f'Word: {word}\nDefinition: {definition} (provided for context only - do not include in sentences)\n'
+        for word, definition in items
+    )
+    prompt = f"""Generate {num_sentences} natural, conversational example sentences for EACH of the words listed below.
+
+IMPORTANT REQUIREMENTS:
+- Each sentence should be natural and could be used in real conversation
+- Do NOT include the meaning or definition of a word in its sentences
+- Do NOT explain what a word means - just use it naturally
+- Just use each word naturally in context, as if the reader already knows what it means
+- Make the sentences diverse and show different ways each word can be used
+- CRITICAL: All sentences MUST be in English only. Do not use any non-English characters, words, or phrases.
+- Respond with a single JSON object mapping each word (exactly as given) to an array of {num_sentences} sentence strings
+
+{word_lines}
+Respond with the JSON object only:"""
+
+    return [
+        {"role": "system", "content": "You are a helpful assistant that generates natural example sentences for words. You always respond with a single JSON object."},
+        {"role": "user", "content": prompt}
+    ]
+
+async def get_example_sentences_batch(client: AsyncOpenAI, items: List[tuple], num_sentences: int = 3) -> Dict[str, str]:
+    """
+    Generate sentences for several (word, definition) pairs in one API call.
+    Returns a mapping of word name -> semicolon-separated sentences.
+    """
+    # Serve cached pairs first and only send misses to the API
+    cache = _get_cache()
+    cached = {}
+    misses = []
+    for word, definition in items:
+        key = _cache_key(word, definition, num_sentences)
+        if key in cache:
+            cached[word] = cache[key]
+        else:
+            misses.append((word, definition))
+
+    if not misses:
+        return cached
+
+    try:
+        response = await create_with_retry(
+            client,
+            model=MODEL,
+            messages=build_multi_word_messages(misses, num_sentences),
+            temperature=0.7,
+            max_completion_tokens=300 * len(misses),
+            response_format={"type": "json_object"}
+        )
+
+        data = json.loads(response.choices[0].message.content)
+        definitions = dict(misses)
+        results = dict(cached)
+        for word, sentences in data.items():
+            if isinstance(sentences, list):
+                sentences = '; '.join(s.strip() for s in sentences if s and s.strip())
+            sentences = clean_sentences(str(sentences), num_sentences)
+            results[word] = sentences
+            if sentences and word in definitions:
+                cache[_cache_key(word, definitions[word], num_sentences)] = sentences
+        return results
+
+    except Exception as e:
+        print(f"    Error generating sentences for batch of {len(misses)}: {e}")
+        return cached
+
+def build_batch_jsonl(pending: List[Dict], filename: str):
+    """Write one Batch API request line per pending word."""
+    with open(filename, 'w', encoding='utf-8') as f:
+        for word in pending:
+            request = {
+                "custom_id": word.get('Word', ''),
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": {
+                    "model": MODEL,
+                    "messages": build_messages(word.get('Word', ''), word.get('Definition', ''), NUM_SENTENCES),
+                    "temperature": 0.7,
+                    "max_completion_tokens": 300,
+                },
+            }
+            f.write(json.dumps(request, ensure_ascii=False) + '\n')
+
+    print(f"Wrote {len(pending)} batch requests to {filename}")
+
+async def run_batch(client: AsyncOpenAI, pending: List[Dict]) -> Dict[str, str]:
+    """
+    Submit pending words as one Batch API job and wait for completion.
+    Returns a mapping of word name -> generated sentences.
+    """
+    build_batch_jsonl(pending, BATCH_INPUT_JSONL)
+
+    with open(BATCH_INPUT_JSONL, 'rb') as f:
+        batch_file = await client.files.create(file=f, purpose="batch")
+
+    batch = await client.batches.create(
+        input_file_id=batch_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    print(f"Submitted batch {batch.id} with {len(pending)} requests. Polling...")
+
+    while batch.status not in ('completed', 'failed', 'expired', 'cancelled'):
+        await asyncio.sleep(BATCH_POLL_SECONDS)
+        batch = await client.batches.retrieve(batch.id)
+        counts = batch.request_counts
+        print(f"  Batch {batch.id}: {batch.status} ({counts.completed}/{counts.total} done, {counts.failed} failed)")
+
+    if batch.status != 'completed':
+        print(f"Batch {batch.id} ended with status {batch.status}")
+        return {}
+
+    output = await client.files.content(batch.output_file_id)
+    results = {}
+    for line in output.text.splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        response = result.get('response') or {}
+        if response.get('status_code') != 200:
+            print(f"  Batch request failed for {result.get('custom_id')}")
+            continue
+        content = response['body']['choices'][0]['message']['content']
+        results[result['custom_id']] = clean_sentences(content, NUM_SENTENCES)
+
+    return results
+
+def make_client(api_key: str) -> AsyncOpenAI:
+    """Build an AsyncOpenAI client with a connection pool sized for our concurrency.
+
+    The SDK's default httpx client keeps a small keepalive pool that
+    serializes requests at high concurrency; an explicit pool avoids that.
+    """
+    limits = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+    http_client = httpx.AsyncClient(limits=limits, timeout=60.0)
+    return AsyncOpenAI(api_key=api_key, http_client=http_client)
+
+async def process_words(words: Iterable[Dict], api_key: str, output_file: str):
     """Process words and add example sentences."""
-    client = OpenAI(api_key=api_key)
-    
-    # Initialize all words with empty sentences column if needed
-    for word in words:
-        if SENTENCES_COLUMN not in word:
-            word[SENTENCES_COLUMN] = ""
-    
-    # Check if output file exists and load it to preserve progress
-    existing_dict = {}
-    if os.path.exists(output_file):
-        existing_words = load_csv(output_file)
-        # Create a dictionary for quick lookup by word name
-        existing_dict = {word.get('Word', ''): word for word in existing_words if word.get('Word')}
-        print(f"Found existing file with {len(existing_words)} words. Resuming from where we left off...")
-    
-    # Process each word
-    total = len(words)
-    processed = 0
+    client = make_client(api_key)
+
+    # Resume from the JSONL checkpoint if present, falling back to the
+    # output CSV from older runs. Only the sentences string is kept per
+    # word, not the whole row.
+    checkpoint_file = output_file + '.jsonl'
+    existing_sentences = {
+        name: checkpointed[SENTENCES_COLUMN]
+        for name, checkpointed in load_checkpoints(checkpoint_file).items()
+        if checkpointed.get(SENTENCES_COLUMN, '').strip()
+    }
+    if existing_sentences:
+        print(f"Found checkpoint file with {len(existing_sentences)} words. Resuming from where we left off...")
+    elif os.path.exists(output_file):
+        existing_sentences = {
+            row['Word']: row[SENTENCES_COLUMN]
+            for row in iter_csv(output_file)
+            if row.get('Word') and row.get(SENTENCES_COLUMN, '').strip()
+        }
+        print(f"Found existing file with {len(existing_sentences)} words. Resuming from where we left off...")
+
+    # Split streamed words into already-done and pending, keeping input order
     skipped = 0
-    new = 0
-    
-    # Start with existing words or create new list
+
     all_words = []
-    
-    # Process each word
+    pending = []
+
     for word in words:
         word_name = word.get('Word', '')
         if not word_name:
             continue
-        
-        # Check if word already has sentences in existing file
-        if word_name in existing_dict:
-            existing_word = existing_dict[word_name]
-            if existing_word.get(SENTENCES_COLUMN) and existing_word[SENTENCES_COLUMN].strip():
-                # Use existing word data but preserve all columns from input
-                word[SENTENCES_COLUMN] = existing_word[SENTENCES_COLUMN]
-                all_words.append(word)
-                skipped += 1
-                print(f"[{len(all_words)}/{total}] Skipping {word_name} (already has sentences)")
-                continue
-        
-        # Word needs processing
-        print(f"[{len(all_words) + 1}/{total}] Processing {word_name}...")
-        
-        # Get definition for context
-        definition = word.get('Definition', '')
-        
-        # Generate example sentences
-        sentences = get_example_sentences(client, word_name, definition, NUM_SENTENCES)
-        
-        if sentences:
-            word[SENTENCES_COLUMN] = sentences
-            print(f"  Generated example sentences")
-            new += 1
-        else:
+
+        if SENTENCES_COLUMN not in word:
             word[SENTENCES_COLUMN] = ""
-            print(f"  Failed to generate sentences")
-        
-        # Add to all_words list
+
+        # Check if word already has sentences from a previous run
+        existing = existing_sentences.get(word_name)
+        if existing:
+            # Keep all columns from the input, only carry the sentences over
+            word[SENTENCES_COLUMN] = existing
+            all_words.append(word)
+            skipped += 1
+            print(f"[{len(all_words)}] Skipping {word_name} (already has sentences)")
+            continue
+
         all_words.append(word)
-        processed += 1
-        
-        # Save progress after each word
+        pending.append(word)
+
+    # Append-only checkpoint: one JSONL line per completed word instead of
+    # rewriting the whole CSV after every completion
+    checkpoint = open(checkpoint_file, 'a', encoding='utf-8', buffering=1 << 16)
+
+    def checkpoint_words(chunk: List[Dict]):
+        for word in chunk:
+            checkpoint.write(json.dumps(word, ensure_ascii=False) + '\n')
+
+    try:
+        await _generate_pending(client, pending, checkpoint_words)
+    finally:
+        checkpoint.close()
+        # Stream everything into the final CSV once
         save_csv(all_words, output_file)
-        
-        # Rate limiting - be respectful to the API
-        time.sleep(1)
-    
+
+    new = sum(1 for word in pending if word.get(SENTENCES_COLUMN))
+    failed = len(pending) - new
+
     print(f"\n{'='*50}")
     print(f"Processing complete!")
-    print(f"Total words: {total}")
-    print(f"Processed: {processed}")
+    print(f"Total words: {len(all_words)}")
+    print(f"Processed: {len(pending)}")
     print(f"New sentences added: {new}")
     print(f"Skipped (already had sentences): {skipped}")
     print(f"Output saved to: {output_file}")
 
+async def _generate_pending(client: AsyncOpenAI, pending: List[Dict], checkpoint_words):
+    """Generate sentences for all pending words, checkpointing as chunks complete."""
+    if not pending:
+        return
+
+    if len(pending) >= BATCH_THRESHOLD:
+        # Bulk job: one Batch API submission covers every pending word
+        results = await run_batch(client, pending)
+        for word in pending:
+            word[SENTENCES_COLUMN] = results.get(word.get('Word', ''), "")
+        checkpoint_words(pending)
+        return
+
+    # Small rerun: concurrent realtime requests, bounded by a semaphore
+    # so we stay within rate limits without sleeping between requests.
+    # Words are packed PROMPT_BATCH_SIZE per prompt so the shared
+    # instruction block is only paid for once per group.
+    sem = asyncio.Semaphore(MAX_CONCURRENCY)
+    completed = 0
+    chunks = [pending[i:i + PROMPT_BATCH_SIZE] for i in range(0, len(pending), PROMPT_BATCH_SIZE)]
+
+    async def worker(chunk: List[Dict]):
+        nonlocal completed
+
+        async with sem:
+            results = await get_example_sentences_batch(
+                client,
+                [(word.get('Word', ''), word.get('Definition', '')) for word in chunk],
+                NUM_SENTENCES
+            )
+
+        for word in chunk:
+            word_name = word.get('Word', '')
+            sentences = results.get(word_name, "")
+            completed += 1
+            if sentences:
+                word[SENTENCES_COLUMN] = sentences
+                print(f"[{completed}/{len(pending)}] {word_name}: Generated example sentences")
+            else:
+                word[SENTENCES_COLUMN] = ""
+                print(f"[{completed}/{len(pending)}] {word_name}: Failed to generate sentences")
+
+        # Checkpoint each chunk as it completes
+        checkpoint_words(chunk)
+
+    await asyncio.gather(*(worker(chunk) for chunk in chunks))
+
 def main():
     print("Dictionary of Obscure Sorrows - Example Sentences Generator")
     print("=" * 60)
-    
+
     # Check for API key
     api_key = os.getenv('OPENAI_API_KEY')
     if not api_key:
@@ -197,20 +467,15 @@ def main():
         print("  Windows CMD: set OPENAI_API_KEY=your-api-key")
         print("  Linux/Mac: export OPENAI_API_KEY='your-api-key'")
         return
-    
-    # Load words from CSV
+
+    # Stream words from CSV so the input is never fully duplicated in memory
     print(f"\nLoading words from {INPUT_CSV}...")
-    words = load_csv(INPUT_CSV)
-    
-    if not words:
-        print("No words found!")
+    if not os.path.exists(INPUT_CSV):
+        print(f"Error: {INPUT_CSV} not found!")
         return
-    
-    print(f"Loaded {len(words)} words")
-    
+
     # Process words
-    process_words(words, api_key, OUTPUT_CSV)
+    asyncio.run(process_words(iter_csv(INPUT_CSV), api_key, OUTPUT_CSV))
 
 if __name__ == '__main__':
     main()
-
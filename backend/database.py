@@ -1,7 +1,7 @@
 """Database setup and models for the Dictionary of Obscure Sorrows."""
-from sqlalchemy import create_engine, Column, Integer, String, Text, Float
+from sqlalchemy import create_engine, event, Column, Integer, String, Text, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import scoped_session, sessionmaker
 import os
 from pathlib import Path
 
@@ -37,8 +37,36 @@ else:
     _db_path.parent.mkdir(parents=True, exist_ok=True)
     DATABASE_URL = f"sqlite:///{_db_path}"
 
-engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {})
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Size the pool explicitly: the default (5 + 10 overflow) locks up under
+# a few dozen concurrent requests, and the recycle/pre-ping settings keep
+# pooled connections valid if the database is ever swapped for a server
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {},
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=30,
+    pool_recycle=3600,
+    pool_pre_ping=True,
+)
+
+if "sqlite" in DATABASE_URL.lower():
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_conn, connection_record):
+        """Tune SQLite per connection: WAL lets readers run during writes,
+        and synchronous=NORMAL avoids a full fsync on every commit."""
+        cursor = dbapi_conn.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")
+        cursor.execute("PRAGMA cache_size=-65536")
+        cursor.close()
+
+# Thread-scoped registry: handlers run on the FastAPI threadpool, so
+# each worker thread reuses one session instead of building a fresh one
+# per request
+SessionLocal = scoped_session(sessionmaker(autocommit=False, autoflush=False, bind=engine))
 Base = declarative_base()
 
 
@@ -69,20 +97,35 @@ class Rating(Base):
     
     # Ensure one rating per user per word per type
     __table_args__ = (
+        # Composite indexes: per-user-per-word lookups become a single
+        # B-tree seek, the word/type/user index serves the grouped stats
+        # aggregations and exact rating lookups, and user/type serves the
+        # rated-word-ids fetches
+        Index('ix_ratings_user_word', 'user_id', 'word_id'),
+        Index('ix_rating_word_type_user', 'word_id', 'rating_type', 'user_id'),
+        Index('ix_rating_user_type', 'user_id', 'rating_type'),
         {"sqlite_autoincrement": True},
     )
 
 
+class Meta(Base):
+    """Key/value metadata, e.g. the content hash of the last synced dictionary.json."""
+    __tablename__ = "meta"
+
+    key = Column(String, primary_key=True)
+    value = Column(String, nullable=False)
+
+
 def init_db():
     """Initialize database tables."""
     Base.metadata.create_all(bind=engine)
 
 
 def get_db():
-    """Get database session."""
+    """Get database session for the current thread, released at request end."""
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
+        SessionLocal.remove()
 
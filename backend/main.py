@@ -1,18 +1,25 @@
 """FastAPI backend for Dictionary of Obscure Sorrows."""
-from fastapi import FastAPI, Depends, HTTPException, Cookie, Response
+from fastapi import FastAPI, Depends, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from starlette.exceptions import HTTPException as StarletteHTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import func, case
+from sqlalchemy import func, case, and_, desc
 from typing import Optional, List
+import bisect
+import random
+import tempfile
+import threading
+import time
+import traceback
 import uuid
 import os
 from pathlib import Path
 
-from database import get_db, Word, Rating, init_db
+from database import get_db, SessionLocal, Word, Rating, init_db
 from pydantic import BaseModel
-import os
+import migrate_data
+import migrate_ratings
 
 # Initialize database
 init_db()
@@ -22,35 +29,85 @@ def migrate_ratings_schema():
     """Migrate ratings from old system to new system if needed."""
     try:
         print("Checking rating schema...")
-        import migrate_ratings
         migrate_ratings.migrate_ratings()
         print("Rating schema check complete.")
     except Exception as e:
         print(f"Error checking rating schema: {e}")
-        import traceback
         traceback.print_exc()
 
-# Migrate ratings on startup
-migrate_ratings_schema()
-
 # Reload word data from dictionary.json on every startup
 def sync_word_data():
     """Reload word data from dictionary.json, preserving user ratings."""
-    from sqlalchemy.orm import Session
-    from database import SessionLocal
-    import traceback
-    
     try:
         print("Syncing word data from dictionary.json...")
-        import migrate_data
-        migrate_data.migrate_data()
+        # Tables were already created by the init_db() call above
+        migrate_data.migrate_data(initialize=False)
         print("Word data sync complete.")
     except Exception as e:
         print(f"Error syncing word data: {e}")
         traceback.print_exc()
 
-# Sync word data on startup (preserves user ratings)
-sync_word_data()
+def run_startup_migrations():
+    """Run the startup migrations, serialized across uvicorn workers.
+
+    With --workers N every worker imports this module and would race the
+    same migrations, causing duplicate work and SQLite "database is
+    locked" errors. An exclusive flock on a sentinel file lets one worker
+    migrate while the rest wait and then breeze through (the dictionary
+    hash check makes the repeated sync a no-op).
+    """
+    try:
+        import fcntl
+    except ImportError:
+        # No fcntl (e.g. Windows dev setups): run unserialized
+        migrate_ratings_schema()
+        sync_word_data()
+        return
+    
+    lock_path = Path(tempfile.gettempdir()) / "obscure_sorrows_migrate.lock"
+    with open(lock_path, 'w') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            migrate_ratings_schema()
+            sync_word_data()
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+# Migrate and sync word data on startup (preserves user ratings)
+run_startup_migrations()
+
+# Word rows are read-only at runtime (reloaded only on startup), so keep
+# them in process-local dicts and skip the Word SELECT on every request;
+# the database is consulted only for rating data
+WORDS_BY_ID = {}
+WORD_BY_NAME = {}
+WORD_IDS_SORTED = []
+
+def build_word_cache():
+    """Preload every word into the in-process cache after the startup sync."""
+    db = SessionLocal()
+    try:
+        WORDS_BY_ID.clear()
+        WORD_BY_NAME.clear()
+        for word in db.query(Word).all():
+            WORDS_BY_ID[word.id] = {
+                "id": word.id,
+                "word": word.word,
+                "definition": word.definition,
+                "part_of_speech": word.part_of_speech,
+                "etymology": word.etymology,
+                "chapter": word.chapter,
+                "concept": word.concept,
+                "tags": word.tags,
+                "example_sentences": word.example_sentences,
+            }
+            WORD_BY_NAME[word.word] = word.id
+        WORD_IDS_SORTED[:] = sorted(WORDS_BY_ID)
+    finally:
+        db.close()
+
+# Build the word cache on startup
+build_word_cache()
 
 app = FastAPI(title="Dictionary of Obscure Sorrows API")
 
@@ -63,6 +120,32 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+
+@app.middleware("http")
+async def user_id_middleware(request: Request, call_next):
+    """Ensure every request carries a user id.
+
+    Reads the user_id cookie (minting a fresh uuid for first-time
+    visitors), exposes it as request.state.user_id, and sets the cookie
+    on the way out — so handlers no longer each repeat the bootstrap.
+    """
+    user_id = request.cookies.get("user_id")
+    new_user = not user_id or user_id == "None"
+    if new_user:
+        user_id = str(uuid.uuid4())
+    request.state.user_id = user_id
+    request.state.new_user = new_user
+    
+    response = await call_next(request)
+    if new_user:
+        response.set_cookie(key="user_id", value=user_id, max_age=31536000, httponly=True, samesite="lax")  # 1 year
+    return response
+
+
+def current_user_id(request: Request) -> str:
+    """Dependency exposing the user id the middleware resolved."""
+    return request.state.user_id
+
 # Pydantic models
 class WordResponse(BaseModel):
     id: int
@@ -92,41 +175,107 @@ class RatingStats(BaseModel):
     user_rating: Optional[int] = None
 
 
-def get_or_create_user_id(user_id: Optional[str] = Cookie(None)) -> Optional[str]:
-    """Get existing user ID from cookie or return None if needs to be created."""
-    if not user_id or user_id == "None":
-        return None
-    return user_id
+# Short-lived cache of aggregate rating stats, shared across users:
+# (word_id, rating_type) -> (monotonic timestamp, rating sum, rating count).
+# rate/unrate fold their change into the entry instead of dropping it,
+# so reads on popular words stay cache hits across writes.
+_stats_cache = {}
+STATS_CACHE_TTL = 30  # seconds
+
+# Per-user set of word ids with an 'overall' rating, used to filter
+# /api/random-word; loaded from the database once per user per process
+# and mutated directly on rate/unrate. Capped because clients that
+# don't persist cookies (bots, health checks, curl) mint a fresh user
+# id per request and would otherwise grow the dict without bound:
+# beyond the cap the oldest entry is evicted and simply reloads from
+# the database on that user's next request.
+RATED_CACHE_MAX_USERS = 10000
+_rated_cache = {}
+
+
+RATING_TYPES = ['overall', 'relatability', 'usefulness', 'name']
+
+
+def get_all_rating_stats(db: Session, word_id: int, user_id: Optional[str] = None) -> dict:
+    """Get rating statistics for every rating type of a word in two queries.
+
+    One GROUP BY covers the aggregates for all types and one query fetches
+    the user's own ratings, instead of two queries per type.
+    """
+    now = time.monotonic()
+    aggregates = {}
+    for rating_type in RATING_TYPES:
+        cached = _stats_cache.get((word_id, rating_type))
+        if cached and now - cached[0] < STATS_CACHE_TTL:
+            aggregates[rating_type] = (cached[1], cached[2])
+        else:
+            aggregates = None
+            break
+    
+    if aggregates is None:
+        rows = db.query(
+            Rating.rating_type,
+            func.sum(Rating.rating),
+            func.count(Rating.id),
+        ).filter(Rating.word_id == word_id).group_by(Rating.rating_type).all()
+        by_type = {rating_type: (rating_sum, total) for rating_type, rating_sum, total in rows}
+        
+        aggregates = {}
+        for rating_type in RATING_TYPES:
+            rating_sum, total = by_type.get(rating_type, (0, 0))
+            aggregates[rating_type] = (rating_sum, total)
+            _stats_cache[(word_id, rating_type)] = (now, rating_sum, total)
+    
+    user_ratings = {}
+    if user_id:
+        user_ratings = dict(db.query(Rating.rating_type, Rating.rating).filter(
+            Rating.word_id == word_id,
+            Rating.user_id == user_id
+        ).all())
+    
+    stats = {}
+    for rating_type in RATING_TYPES:
+        rating_sum, total = aggregates[rating_type]
+        stats[rating_type] = {
+            "average": round(rating_sum / total, 1) if total else 0.0,
+            "total": total,
+            "user_rating": user_ratings.get(rating_type)
+        }
+    return stats
 
 
 def get_rating_stats(db: Session, word_id: int, rating_type: str = 'overall', user_id: Optional[str] = None) -> dict:
     """Get rating statistics for a word and rating type."""
-    # Get all ratings for this word and type
-    ratings_query = db.query(Rating).filter(
-        Rating.word_id == word_id,
-        Rating.rating_type == rating_type
-    )
-    
-    ratings = ratings_query.all()
-    total = len(ratings)
-    
-    if total == 0:
-        return {
-            "average": 0.0,
-            "total": 0,
-            "user_rating": None
-        }
+    # The aggregate part is identical for every user, so serve it from a
+    # short TTL cache; only the user's own rating is always fetched fresh
+    now = time.monotonic()
+    cached = _stats_cache.get((word_id, rating_type))
+    if cached and now - cached[0] < STATS_CACHE_TTL:
+        rating_sum, total = cached[1], cached[2]
+    else:
+        # Aggregate in SQL and project only the two numbers needed,
+        # skipping the per-row ORM hydration entirely
+        rating_sum, total = db.query(
+            func.sum(Rating.rating),
+            func.count(Rating.id),
+        ).filter(
+            Rating.word_id == word_id,
+            Rating.rating_type == rating_type
+        ).one()
+        rating_sum = rating_sum or 0
+        
+        _stats_cache[(word_id, rating_type)] = (now, rating_sum, total)
     
-    # Calculate average
-    total_rating = sum(r.rating for r in ratings)
-    average = round(total_rating / total, 1)
+    average = round(rating_sum / total, 1) if total else 0.0
     
     # Get user's rating if user_id provided
     user_rating = None
     if user_id:
-        user_rating_obj = ratings_query.filter(Rating.user_id == user_id).first()
-        if user_rating_obj:
-            user_rating = user_rating_obj.rating
+        user_rating = db.query(Rating.rating).filter(
+            Rating.word_id == word_id,
+            Rating.rating_type == rating_type,
+            Rating.user_id == user_id
+        ).scalar()
     
     return {
         "average": average,
@@ -135,125 +284,83 @@ def get_rating_stats(db: Session, word_id: int, rating_type: str = 'overall', us
     }
 
 
+def get_rated_ids(db: Session, user_id: str) -> set:
+    """Get the cached set of word ids this user has rated overall."""
+    rated_ids = _rated_cache.get(user_id)
+    if rated_ids is None:
+        rated_ids = {
+            word_id for (word_id,) in db.query(Rating.word_id).filter(
+                Rating.user_id == user_id,
+                Rating.rating_type == 'overall'
+            ).all()
+        }
+        while len(_rated_cache) >= RATED_CACHE_MAX_USERS:
+            _rated_cache.pop(next(iter(_rated_cache)))
+        _rated_cache[user_id] = rated_ids
+    return rated_ids
+
+
 @app.get("/api/random-word", response_model=WordResponse)
-async def get_random_word(
-    response: Response,
-    user_id: Optional[str] = Cookie(None),
+def get_random_word(
+    user_id: str = Depends(current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get a random word that the user hasn't rated yet."""
-    user_id = get_or_create_user_id(user_id)
-    if not user_id:
-        user_id = str(uuid.uuid4())
-        response.set_cookie(key="user_id", value=user_id, max_age=31536000, httponly=True, samesite="lax")
+    # The user's rated ids and the word data both come from in-process
+    # caches, so the common case runs without any query at all (only
+    # overall ratings count)
+    rated_ids = get_rated_ids(db, user_id)
     
-    # Get all rated word IDs for this user (only overall ratings count)
-    rated_word_ids = {r.word_id for r in db.query(Rating.word_id).filter(
-        Rating.user_id == user_id,
-        Rating.rating_type == 'overall'
-    ).all()}
+    unrated_ids = [word_id for word_id in WORD_IDS_SORTED if word_id not in rated_ids]
     
-    # Get a random word that hasn't been rated
-    query = db.query(Word)
-    if rated_word_ids:
-        query = query.filter(~Word.id.in_(rated_word_ids))
-    
-    word = query.order_by(func.random()).first()
-    
-    if not word:
+    if unrated_ids:
+        word_id = random.choice(unrated_ids)
+    elif WORD_IDS_SORTED:
         # All words rated, return any random word
-        word = db.query(Word).order_by(func.random()).first()
-    
-    if not word:
+        word_id = random.choice(WORD_IDS_SORTED)
+    else:
         raise HTTPException(status_code=404, detail="No words found")
     
     # Get rating stats for all types
-    rating_types = ['overall', 'relatability', 'usefulness', 'name']
-    stats = {}
-    for rating_type in rating_types:
-        stats[rating_type] = get_rating_stats(db, word.id, rating_type, user_id)
-    
-    response = WordResponse(
-        id=word.id,
-        word=word.word,
-        definition=word.definition,
-        part_of_speech=word.part_of_speech,
-        etymology=word.etymology,
-        chapter=word.chapter,
-        concept=word.concept,
-        tags=word.tags,
-        example_sentences=word.example_sentences,
-        rating_stats=stats
-    )
+    stats = get_all_rating_stats(db, word_id, user_id)
     
-    return response
+    return WordResponse(**WORDS_BY_ID[word_id], rating_stats=stats)
 
 
 @app.get("/api/word/{word_identifier}", response_model=WordResponse)
-async def get_word(
+def get_word(
     word_identifier: str,
-    response: Response,
-    user_id: Optional[str] = Cookie(None),
+    user_id: str = Depends(current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get a specific word by ID (integer) or name (string)."""
-    user_id = get_or_create_user_id(user_id)
-    if not user_id:
-        user_id = str(uuid.uuid4())
-        response.set_cookie(key="user_id", value=user_id, max_age=31536000, httponly=True, samesite="lax")
-    
     # Try to parse as integer ID first
-    word = None
-    if word_identifier.isdigit():
-        word = db.query(Word).filter(Word.id == int(word_identifier)).first()
+    word_id = None
+    if word_identifier.isdigit() and int(word_identifier) in WORDS_BY_ID:
+        word_id = int(word_identifier)
     
     # If not found by ID, try by word name
-    if not word:
-        word = db.query(Word).filter(Word.word == word_identifier).first()
+    if word_id is None:
+        word_id = WORD_BY_NAME.get(word_identifier)
     
-    if not word:
+    if word_id is None:
         raise HTTPException(status_code=404, detail="Word not found")
     
     # Get rating stats for all types
-    rating_types = ['overall', 'relatability', 'usefulness', 'name']
-    stats = {}
-    for rating_type in rating_types:
-        stats[rating_type] = get_rating_stats(db, word.id, rating_type, user_id)
-    
-    response = WordResponse(
-        id=word.id,
-        word=word.word,
-        definition=word.definition,
-        part_of_speech=word.part_of_speech,
-        etymology=word.etymology,
-        chapter=word.chapter,
-        concept=word.concept,
-        tags=word.tags,
-        example_sentences=word.example_sentences,
-        rating_stats=stats
-    )
+    stats = get_all_rating_stats(db, word_id, user_id)
     
-    return response
+    return WordResponse(**WORDS_BY_ID[word_id], rating_stats=stats)
 
 
 @app.post("/api/rate")
-async def rate_word(
+def rate_word(
     rating_req: RatingRequest,
-    response: Response,
-    user_id: Optional[str] = Cookie(None),
+    user_id: str = Depends(current_user_id),
     db: Session = Depends(get_db)
 ):
     """Rate a word. Can update existing rating."""
-    user_id = get_or_create_user_id(user_id)
-    
-    # Set cookie if not present
-    if not user_id:
-        user_id = str(uuid.uuid4())
-        response.set_cookie(key="user_id", value=user_id, max_age=31536000, httponly=True, samesite="lax")  # 1 year
-    
     # Check if word exists
-    word = db.query(Word).filter(Word.id == rating_req.word_id).first()
-    if not word:
+    if rating_req.word_id not in WORDS_BY_ID:
         raise HTTPException(status_code=404, detail="Word not found")
     
     # Validate rating
@@ -271,6 +378,8 @@ async def rate_word(
         Rating.rating_type == rating_req.rating_type
     ).first()
     
+    old_rating = existing_rating.rating if existing_rating else None
+    
     if existing_rating:
         # Update existing rating
         existing_rating.rating = rating_req.rating
@@ -286,28 +395,37 @@ async def rate_word(
         db.add(rating)
         db.commit()
     
+    # Fold the change into the cached aggregate so reads keep hitting
+    cache_key = (rating_req.word_id, rating_req.rating_type)
+    cached = _stats_cache.get(cache_key)
+    if cached:
+        rating_sum = cached[1] + rating_req.rating - (old_rating or 0)
+        total = cached[2] + (0 if old_rating is not None else 1)
+        _stats_cache[cache_key] = (time.monotonic(), rating_sum, total)
+    if rating_req.rating_type == 'overall' and user_id in _rated_cache:
+        _rated_cache[user_id].add(rating_req.word_id)
+    _leaderboard_cache["time"] = 0.0
+    
     # Return updated stats for this rating type
     stats = get_rating_stats(db, rating_req.word_id, rating_req.rating_type, user_id)
     return {"message": "Rating saved", "stats": stats}
 
 
 @app.delete("/api/rate/{word_id}")
-async def unrate_word(
+def unrate_word(
+    request: Request,
     word_id: int,
     rating_type: str = 'overall',
-    user_id: Optional[str] = Cookie(None),
+    user_id: str = Depends(current_user_id),
     db: Session = Depends(get_db)
 ):
     """Remove rating for a word."""
-    
-    user_id = get_or_create_user_id(user_id)
-    
-    if not user_id:
+    # A first-time visitor cannot have ratings to remove
+    if request.state.new_user:
         raise HTTPException(status_code=401, detail="User not authenticated")
     
     # Check if word exists
-    word = db.query(Word).filter(Word.id == word_id).first()
-    if not word:
+    if word_id not in WORDS_BY_ID:
         raise HTTPException(status_code=404, detail="Word not found")
     
     # Validate rating type
@@ -322,8 +440,16 @@ async def unrate_word(
     ).first()
     
     if existing_rating:
+        old_rating = existing_rating.rating
         db.delete(existing_rating)
         db.commit()
+        # Fold the removal into the cached aggregate so reads keep hitting
+        cached = _stats_cache.get((word_id, rating_type))
+        if cached:
+            _stats_cache[(word_id, rating_type)] = (time.monotonic(), cached[1] - old_rating, cached[2] - 1)
+        if rating_type == 'overall' and user_id in _rated_cache:
+            _rated_cache[user_id].discard(word_id)
+        _leaderboard_cache["time"] = 0.0
     
     # Get updated stats
     stats = get_rating_stats(db, word_id, rating_type, user_id)
@@ -332,69 +458,39 @@ async def unrate_word(
 
 
 @app.get("/api/next-word-id/{current_id}")
-async def get_next_word_id(
-    current_id: int,
-    response: Response,
-    user_id: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
-):
+async def get_next_word_id(current_id: int):
     """Get the next word ID in sequence."""
-    user_id = get_or_create_user_id(user_id)
-    if not user_id:
-        user_id = str(uuid.uuid4())
-        response.set_cookie(key="user_id", value=user_id, max_age=31536000, httponly=True, samesite="lax")
-    
-    # Get next word (by ID)
-    next_word = db.query(Word).filter(Word.id > current_id).order_by(Word.id).first()
-    
-    if not next_word:
-        # Wrap around to first word
-        next_word = db.query(Word).order_by(Word.id).first()
-    
-    if not next_word:
+    if not WORD_IDS_SORTED:
         raise HTTPException(status_code=404, detail="No words found")
     
-    return {"word_id": next_word.id}
+    # Get next word (by ID) from the precomputed sorted ids, wrapping
+    # around to the first word
+    idx = bisect.bisect_right(WORD_IDS_SORTED, current_id)
+    next_id = WORD_IDS_SORTED[idx] if idx < len(WORD_IDS_SORTED) else WORD_IDS_SORTED[0]
+    
+    return {"word_id": next_id}
 
 
 @app.get("/api/prev-word-id/{current_id}")
-async def get_prev_word_id(
-    current_id: int,
-    response: Response,
-    user_id: Optional[str] = Cookie(None),
-    db: Session = Depends(get_db)
-):
+async def get_prev_word_id(current_id: int):
     """Get the previous word ID in sequence."""
-    user_id = get_or_create_user_id(user_id)
-    if not user_id:
-        user_id = str(uuid.uuid4())
-        response.set_cookie(key="user_id", value=user_id, max_age=31536000, httponly=True, samesite="lax")
-    
-    # Get previous word (by ID)
-    prev_word = db.query(Word).filter(Word.id < current_id).order_by(Word.id.desc()).first()
-    
-    if not prev_word:
-        # Wrap around to last word
-        prev_word = db.query(Word).order_by(Word.id.desc()).first()
-    
-    if not prev_word:
+    if not WORD_IDS_SORTED:
         raise HTTPException(status_code=404, detail="No words found")
     
-    return {"word_id": prev_word.id}
+    # Get previous word (by ID) from the precomputed sorted ids, wrapping
+    # around to the last word
+    idx = bisect.bisect_left(WORD_IDS_SORTED, current_id) - 1
+    prev_id = WORD_IDS_SORTED[idx] if idx >= 0 else WORD_IDS_SORTED[-1]
+    
+    return {"word_id": prev_id}
 
 
 @app.get("/api/rated-words")
-async def get_rated_words(
-    response: Response,
-    user_id: Optional[str] = Cookie(None),
+def get_rated_words(
+    user_id: str = Depends(current_user_id),
     db: Session = Depends(get_db)
 ):
     """Get list of word IDs that the user has rated."""
-    user_id = get_or_create_user_id(user_id)
-    if not user_id:
-        user_id = str(uuid.uuid4())
-        response.set_cookie(key="user_id", value=user_id, max_age=31536000, httponly=True, samesite="lax")
-    
     rated_ids = [r.word_id for r in db.query(Rating.word_id).filter(Rating.user_id == user_id).all()]
     return {"rated_word_ids": rated_ids}
 
@@ -406,52 +502,79 @@ class LeaderboardEntry(BaseModel):
     total_ratings: int
 
 
+# The leaderboard is identical for every visitor and changes only when
+# someone rates, so it is computed at most once per TTL window (rating
+# writes invalidate it immediately, so the TTL can be generous)
+LEADERBOARD_CACHE_TTL = 60  # seconds
+_leaderboard_cache = {"time": 0.0, "data": None}
+_leaderboard_lock = threading.Lock()
+
+
 @app.get("/api/leaderboard", response_model=List[LeaderboardEntry])
-async def get_leaderboard(
+def get_leaderboard(
     db: Session = Depends(get_db)
 ):
     """Get leaderboard of all words sorted by average rating (overall only)."""
-    # Get all words with their rating stats
-    words = db.query(Word).all()
-    
-    leaderboard = []
-    for word in words:
-        # Only use overall rating for leaderboard
-        stats = get_rating_stats(db, word.id, 'overall')
-        average = stats.get("average", 0.0)
-        total = stats.get("total", 0)
-        
-        leaderboard.append((
-            average,  # For sorting
-            total,  # For tie-breaking
-            LeaderboardEntry(
-                word_id=word.id,
-                word=word.word,
-                average=average,
-                total_ratings=total
-            )
-        ))
-    
-    # Sort by average (descending), then by total_ratings (descending) for ties
-    leaderboard.sort(key=lambda x: (x[0], x[1]), reverse=True)
-    
-    # Extract just the entries (without sorting scores)
-    return [entry for _, _, entry in leaderboard]
+    if _leaderboard_cache["data"] is not None and time.monotonic() - _leaderboard_cache["time"] < LEADERBOARD_CACHE_TTL:
+        return _leaderboard_cache["data"]
+    
+    with _leaderboard_lock:
+        # Another request may have refreshed the cache while we waited
+        if _leaderboard_cache["data"] is not None and time.monotonic() - _leaderboard_cache["time"] < LEADERBOARD_CACHE_TTL:
+            return _leaderboard_cache["data"]
+        return _compute_leaderboard(db)
+
+
+def _compute_leaderboard(db: Session) -> List[LeaderboardEntry]:
+    """Recompute the leaderboard and refresh the shared cache."""
+    # One query: join, aggregation, and ordering all happen in SQLite.
+    # Sorted by average (descending), then total ratings for ties.
+    rows = db.query(
+        Word.id,
+        Word.word,
+        func.coalesce(func.avg(Rating.rating), 0.0).label('average'),
+        func.count(Rating.id).label('total'),
+    ).outerjoin(
+        Rating, and_(Rating.word_id == Word.id, Rating.rating_type == 'overall')
+    ).group_by(Word.id).order_by(desc('average'), desc('total')).all()
+    
+    entries = [
+        LeaderboardEntry(
+            word_id=word_id,
+            word=word_name,
+            average=round(average, 1),
+            total_ratings=total
+        )
+        for word_id, word_name, average, total in rows
+    ]
+    _leaderboard_cache["data"] = entries
+    _leaderboard_cache["time"] = time.monotonic()
+    return entries
+
+
+class SPAStaticFiles(StaticFiles):
+    """StaticFiles that falls back to index.html for client-side routes."""
+    
+    async def get_response(self, path: str, scope):
+        # Starlette raises HTTPException(404) for missing files (older
+        # versions returned a 404 response), so handle both. Unknown
+        # /api/* paths keep their JSON 404 instead of a 200 HTML page.
+        try:
+            response = await super().get_response(path, scope)
+        except StarletteHTTPException as exc:
+            if exc.status_code != 404 or path.startswith("api"):
+                raise
+            return await super().get_response("index.html", scope)
+        if response.status_code == 404 and not path.startswith("api"):
+            response = await super().get_response("index.html", scope)
+        return response
 
 
 # Serve React app in production
-# When running from /app/backend, go up one level to /app, then to frontend/build
+# When running from /app/backend, go up one level to /app, then to frontend/build.
+# Mounted at "/" after the API routes, so /api/* never reaches it; asset
+# requests are answered by the mount without running any route handler.
 frontend_build = Path(__file__).parent.parent / "frontend" / "build"
 if frontend_build.exists():
-    app.mount("/static", StaticFiles(directory=str(frontend_build / "static")), name="static")
-    
-    @app.get("/{full_path:path}")
-    async def serve_react_app(full_path: str):
-        """Serve React app for all non-API routes."""
-        if full_path.startswith("api/"):
-            raise HTTPException(status_code=404, detail="Not found")
-        file_path = frontend_build / full_path
-        if file_path.exists() and file_path.is_file():
-            return FileResponse(file_path)
-        return FileResponse(frontend_build / "index.html")
+    app.mount("/", SPAStaticFiles(directory=str(frontend_build), html=True), name="frontend")
 
@@ -1,11 +1,39 @@
 """Migrate dictionary.json to SQLite database."""
+import hashlib
 import json
 import sys
 from pathlib import Path
-from database import SessionLocal, Word, init_db
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from database import SessionLocal, Meta, Word, init_db
 
-def migrate_data(json_file: str = "dictionary.json"):
-    """Load words from JSON and insert into database."""
+DICT_HASH_KEY = 'dict_hash'
+
+# ijson streams records one at a time instead of parsing the whole file;
+# fall back to json.load when it is not installed
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+# Rows per upsert statement; keeps each statement well under SQLite's
+# bound-variable limit
+UPSERT_BATCH_SIZE = 500
+
+def iter_words(json_path: Path):
+    """Yield word records from the JSON array one at a time."""
+    if HAS_IJSON:
+        with open(json_path, 'rb') as f:
+            yield from ijson.items(f, 'item')
+    else:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
+
+def migrate_data(json_file: str = "dictionary.json", initialize: bool = True):
+    """Load words from JSON and insert into database.
+
+    Pass initialize=False when the caller has already run init_db().
+    """
     # Try current directory first (for Docker)
     json_path = Path(__file__).parent / json_file
     if not json_path.exists():
@@ -15,57 +43,77 @@ def migrate_data(json_file: str = "dictionary.json"):
         print(f"Error: {json_path} not found!")
         return
     
+    # Initialize database
+    if initialize:
+        init_db()
+    db = SessionLocal()
+    
+    # Skip the whole sync when dictionary.json is byte-identical to the
+    # last synced version; every uvicorn worker runs this on startup, so
+    # the hash check turns the common no-change case into one SELECT
+    dict_hash = hashlib.sha256(json_path.read_bytes()).hexdigest()
+    stored_hash = db.get(Meta, DICT_HASH_KEY)
+    if stored_hash and stored_hash.value == dict_hash:
+        print(f"{json_path} unchanged since last sync, skipping.")
+        db.close()
+        return
+    
     print(f"Loading data from {json_path}...")
-    with open(json_path, 'r', encoding='utf-8') as f:
-        words_data = json.load(f)
     
-    print(f"Found {len(words_data)} words")
+    update_columns = [
+        'definition', 'part_of_speech', 'etymology', 'chapter',
+        'concept', 'tags', 'example_sentences'
+    ]
     
-    # Initialize database
-    init_db()
-    db = SessionLocal()
+    def upsert_batch(batch):
+        stmt = sqlite_insert(Word).values(batch)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['word'],
+            set_={column: stmt.excluded[column] for column in update_columns}
+        )
+        db.execute(stmt)
     
     try:
-        # Upsert words (update existing or insert new)
-        # This preserves user ratings while updating word data
-        updated_count = 0
-        inserted_count = 0
-        
-        for word_data in words_data:
-            word_name = word_data.get('Word', '')
-            if not word_name:
+        # Upsert words (update existing or insert new) with
+        # INSERT ... ON CONFLICT(word) DO UPDATE, so the whole sync runs
+        # as a handful of batched statements instead of a SELECT plus an
+        # UPDATE or INSERT per word. Records are streamed straight into
+        # fixed-size batches, so peak memory stays O(batch) rather than
+        # O(file). User ratings are preserved because only word columns
+        # are touched.
+        total = 0
+        batch = []
+        for word_data in iter_words(json_path):
+            if not word_data.get('Word', ''):
                 continue
-            
-            # Check if word already exists
-            existing_word = db.query(Word).filter(Word.word == word_name).first()
-            
-            if existing_word:
-                # Update existing word
-                existing_word.definition = word_data.get('Definition', '')
-                existing_word.part_of_speech = word_data.get('Part of Speech', '')
-                existing_word.etymology = word_data.get('Etymology', '')
-                existing_word.chapter = word_data.get('Chapter', '')
-                existing_word.concept = word_data.get('Concept', '')
-                existing_word.tags = word_data.get('Tags', '')
-                existing_word.example_sentences = word_data.get('Example Sentences', '')
-                updated_count += 1
-            else:
-                # Insert new word
-                word = Word(
-                    word=word_name,
-                    definition=word_data.get('Definition', ''),
-                    part_of_speech=word_data.get('Part of Speech', ''),
-                    etymology=word_data.get('Etymology', ''),
-                    chapter=word_data.get('Chapter', ''),
-                    concept=word_data.get('Concept', ''),
-                    tags=word_data.get('Tags', ''),
-                    example_sentences=word_data.get('Example Sentences', '')
-                )
-                db.add(word)
-                inserted_count += 1
+            batch.append({
+                'word': word_data['Word'],
+                'definition': word_data.get('Definition', ''),
+                'part_of_speech': word_data.get('Part of Speech', ''),
+                'etymology': word_data.get('Etymology', ''),
+                'chapter': word_data.get('Chapter', ''),
+                'concept': word_data.get('Concept', ''),
+                'tags': word_data.get('Tags', ''),
+                'example_sentences': word_data.get('Example Sentences', '')
+            })
+            if len(batch) >= UPSERT_BATCH_SIZE:
+                upsert_batch(batch)
+                total += len(batch)
+                batch = []
+        
+        if batch:
+            upsert_batch(batch)
+            total += len(batch)
         
+        # Record the synced content hash inside the same transaction
+        hash_stmt = sqlite_insert(Meta).values(key=DICT_HASH_KEY, value=dict_hash)
+        hash_stmt = hash_stmt.on_conflict_do_update(
+            index_elements=['key'],
+            set_={'value': hash_stmt.excluded.value}
+        )
+        db.execute(hash_stmt)
         db.commit()
-        print(f"Successfully synced {len(words_data)} words: {updated_count} updated, {inserted_count} inserted")
+        print(f"Successfully synced {total} words")
     except Exception as e:
         db.rollback()
         print(f"Error migrating data: {e}")
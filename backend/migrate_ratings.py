@@ -1,5 +1,5 @@
 """Migrate ratings from old system (-1/0/1) to new system (1-5 stars with types)."""
-from sqlalchemy import inspect, text
+from sqlalchemy import inspect, or_, text, update
 from database import engine, SessionLocal, Rating, Base
 import os
 
@@ -35,48 +35,34 @@ def migrate_ratings():
             db.commit()
         
         # Migrate existing ratings: -1 -> 1 star, 0 -> 3 stars, 1 -> 5 stars
+        # One bulk UPDATE per old value keeps the conversion inside the
+        # database instead of loading and mutating every row in Python
         print("Migrating existing ratings...")
-        old_ratings = db.query(Rating).filter(Rating.rating.in_([-1, 0, 1])).all()
-        
         migrated_count = 0
-        for rating in old_ratings:
-            # Convert old rating to new system
-            if rating.rating == -1:
-                new_rating = 1  # 1 star
-            elif rating.rating == 0:
-                new_rating = 3  # 3 stars
-            elif rating.rating == 1:
-                new_rating = 5  # 5 stars
-            else:
-                continue  # Skip if already migrated
-            
-            rating.rating = new_rating
-            rating.rating_type = 'overall'  # Set type to overall for migrated ratings
-            migrated_count += 1
+        for old_rating, new_rating in [(-1, 1), (0, 3), (1, 5)]:
+            result = db.execute(
+                update(Rating)
+                .where(Rating.rating == old_rating)
+                .values(rating=new_rating, rating_type='overall')
+            )
+            migrated_count += result.rowcount
         
         db.commit()
         print(f"Migrated {migrated_count} ratings to new system.")
         
         # Update any ratings that are already 1-5 but don't have rating_type
         print("Updating ratings without rating_type...")
-        from sqlalchemy import or_, and_
-        # Check if rating_type column exists and handle None values
-        ratings_without_type = db.query(Rating).filter(
-            and_(
+        result = db.execute(
+            update(Rating)
+            .where(
                 Rating.rating.between(1, 5),
-                or_(
-                    Rating.rating_type == None,
-                    Rating.rating_type == '',
-                    Rating.rating_type.is_(None)
-                )
+                or_(Rating.rating_type.is_(None), Rating.rating_type == '')
             )
-        ).all()
-        
-        for rating in ratings_without_type:
-            rating.rating_type = 'overall'
+            .values(rating_type='overall')
+        )
         
         db.commit()
-        print(f"Updated {len(ratings_without_type)} ratings with rating_type.")
+        print(f"Updated {result.rowcount} ratings with rating_type.")
         
     except Exception as e:
         db.rollback()
@@ -6,15 +6,30 @@ Preserves exact text content, only adding line breaks.
 Saves progress incrementally and skips words that already have formatted definitions.
 """
 
+import argparse
+import asyncio
+import hashlib
 import json
+from collections import Counter
 import os
+import random
 import re
+import shelve
+import signal
 import time
-from openai import OpenAI
-from typing import List, Dict
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError, APITimeoutError, BadRequestError
+from typing import Dict, List, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
+# orjson's C serializer is several times faster than stdlib json and
+# writes bytes directly; fall back to stdlib when it is not installed
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 # Load environment variables from .env file
 load_dotenv()
 
@@ -23,17 +38,59 @@ INPUT_JSON = 'dictionary.json'
 OUTPUT_JSON = 'dictionary_formatted.json'  # New file, not in-place
 BACKUP_JSON = 'dictionary_backup.json'
 MODEL = 'gpt-4o'  # Use gpt-4o for better understanding
+MAX_CONCURRENCY = 20  # Default number of OpenAI requests kept in flight at once
+MAX_RETRIES = 5  # Attempts per request before falling back to the original text
+SAVE_EVERY = 25  # Words between progress saves; each save rewrites the whole file
+TRIVIAL_WORD_COUNT = 25  # Definitions shorter than this with no break markers skip the API
+BREAK_MARKERS = ('\u2014', '; ', ': ')  # Punctuation that suggests a core/illustration split
+CACHE_FILE = '.format_cache'  # On-disk response cache; reruns skip the API entirely
+
+SYSTEM_PROMPT = "You are a helpful assistant that formats text by adding newlines for readability. You never change the actual words or content, only add line breaks. Never add the word itself to the beginning of the definition."
+
+_format_cache = None
+
+def _get_cache() -> shelve.Shelf:
+    """Open the on-disk response cache lazily (so importing this module has no side effects)."""
+    global _format_cache
+    if _format_cache is None:
+        _format_cache = shelve.open(CACHE_FILE)
+    return _format_cache
+
+def _cache_key(definition: str) -> str:
+    """Content-addressed cache key: model or prompt edits invalidate naturally."""
+    return hashlib.sha256(f"{MODEL}|{SYSTEM_PROMPT}|{definition}".encode()).hexdigest()
+
+# Precompiled patterns (hot path: several substitutions per word)
+_NEWLINE = re.compile(r'\n')
+_PUNCT = re.compile(r'[^\w\s]')
+_WHITESPACE = re.compile(r'\s+')
+_WORD = re.compile(r'\w+')
+_FENCE_OPEN = re.compile(r'^```[\w]*\n?', re.MULTILINE)
+_FENCE_CLOSE = re.compile(r'\n?```$', re.MULTILINE)
+
+# Resolved file locations, so repeated saves don't re-stat the filesystem
+_resolved_paths = {}
+
+def resolve_path(filename: str):
+    """Return the first existing path among filename and backend/filename, or None."""
+    if filename not in _resolved_paths:
+        json_path = Path(filename)
+        if not json_path.exists():
+            # Try backend directory
+            json_path = Path("backend") / filename
+        _resolved_paths[filename] = json_path if json_path.exists() else None
+    return _resolved_paths[filename]
 
 def load_json(filename: str) -> List[Dict]:
     """Load JSON file and return as list of dictionaries."""
-    json_path = Path(filename)
-    if not json_path.exists():
-        # Try backend directory
-        json_path = Path("backend") / filename
-    if not json_path.exists():
+    json_path = resolve_path(filename)
+    if json_path is None:
         print(f"Error: {filename} not found!")
         return []
     
+    if HAS_ORJSON:
+        # orjson parses the raw bytes directly, skipping the text decode
+        return orjson.loads(json_path.read_bytes())
     with open(json_path, 'r', encoding='utf-8') as f:
         words = json.load(f)
     
@@ -44,12 +101,23 @@ def save_json(words: List[Dict], filename: str):
     if not words:
         return
     
-    json_path = Path(filename)
-    if not json_path.exists():
-        json_path = Path("backend") / filename
+    json_path = resolve_path(filename)
+    if json_path is None:
+        # First save creates the file in the working directory
+        json_path = Path(filename)
+        _resolved_paths[filename] = json_path
     
-    with open(json_path, 'w', encoding='utf-8') as f:
-        json.dump(words, f, ensure_ascii=False, indent=2)
+    # Write to a sibling temp file and swap it in atomically, so a crash
+    # mid-write never leaves a half-written JSON behind
+    tmp_path = json_path.with_suffix(json_path.suffix + '.tmp')
+    if HAS_ORJSON:
+        tmp_path.write_bytes(orjson.dumps(words, option=orjson.OPT_INDENT_2))
+    else:
+        # 1 MiB buffer: json.dump emits many tiny writes, so batch them
+        # into a few large syscalls
+        with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            json.dump(words, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, json_path)
     
     print(f"  Saved progress to {json_path}")
 
@@ -58,48 +126,76 @@ def normalize_text(text: str) -> str:
     # Replace literal \n with spaces
     text = text.replace('\\n', ' ')
     # Replace actual newlines with spaces
-    text = re.sub(r'\n', ' ', text)
+    text = _NEWLINE.sub(' ', text)
     # Replace punctuation with spaces (preserves word boundaries)
-    text = re.sub(r'[^\w\s]', ' ', text)
+    text = _PUNCT.sub(' ', text)
     # Normalize all whitespace to single spaces
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE.sub(' ', text)
     return text.strip().lower()
 
-def verify_text_unchanged(original: str, formatted: str) -> bool:
-    """Fuzzy vibe check - ensure the text is roughly the same, allowing for minor differences."""
-    original_norm = normalize_text(original)
-    formatted_norm = normalize_text(formatted)
+def tokenize(text: str) -> List[str]:
+    """Normalize text and extract just the words (no punctuation, no spaces)."""
+    return _WORD.findall(normalize_text(text))
+
+def verify_text_unchanged(original_words: List[str], formatted: str) -> bool:
+    """Fuzzy vibe check - ensure the text is roughly the same, allowing for minor differences.
+
+    Takes the original side pre-tokenized so callers normalize it once
+    per word, not once per verification.
+    """
+    formatted_words = tokenize(formatted)
     
-    # Extract just the words (no punctuation, no spaces)
-    original_words = re.findall(r'\w+', original_norm)
-    formatted_words = re.findall(r'\w+', formatted_norm)
+    # Fast path: adding newlines should leave the word sequence intact
+    if original_words == formatted_words:
+        return True
     
     # Must have roughly the same number of words (within 5% difference)
     word_count_diff = abs(len(original_words) - len(formatted_words))
     if word_count_diff > max(2, len(original_words) * 0.05):
         return False
     
-    # Check that most words are the same (at least 90% match)
-    # Create sets for comparison
-    original_set = set(original_words)
-    formatted_set = set(formatted_words)
+    # Check that most words are the same (at least 90% match), counting
+    # repeats: a multiset comparison, unlike sets, does not collapse
+    # "the the the" into one occurrence
+    original_counts = Counter(original_words)
+    formatted_counts = Counter(formatted_words)
     
-    # Calculate similarity
-    common_words = original_set & formatted_set
-    total_unique_words = len(original_set | formatted_set)
+    common = sum((original_counts & formatted_counts).values())
+    total = sum((original_counts | formatted_counts).values())
     
-    if total_unique_words == 0:
+    if total == 0:
         return True
     
-    similarity = len(common_words) / total_unique_words
+    similarity = common / total
     
     # Allow if similarity is at least 90%
     return similarity >= 0.90
 
-def format_definition(client: OpenAI, word: str, definition: str) -> str:
+async def create_with_retry(client: AsyncOpenAI, **kwargs):
+    """Call chat.completions.create, retrying transient failures with jittered backoff.
+
+    Rate limits, timeouts, and 5xx responses are worth retrying;
+    BadRequestError is permanent and re-raised immediately.
+    """
+    for attempt in range(MAX_RETRIES):
+        try:
+            return await client.chat.completions.create(**kwargs)
+        except BadRequestError:
+            raise
+        except (APITimeoutError, APIConnectionError, APIStatusError) as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            delay = (2 ** attempt) + random.random()
+            print(f"    Transient API error ({type(e).__name__}), retrying in {delay:.1f}s...")
+            await asyncio.sleep(delay)
+
+async def format_definition(client: AsyncOpenAI, word: str, definition: str,
+                            original_words: Optional[List[str]] = None) -> str:
     """
     Use OpenAI API to format definition by adding newlines for readability.
     Returns the same definition with newlines inserted, or original if formatting fails.
+    Callers that already tokenized the definition can pass original_words
+    to avoid tokenizing it a second time.
     """
     prompt = f"""Analyze the following definition and add newlines (\\n) to separate the core meaning from supporting material.
 
@@ -122,11 +218,24 @@ Definition: {definition}
 
 Identify: What is the essential definition, and what is supporting illustration? Separate them with a newline."""
 
+    # Re-runs for failed or partial batches hit the disk cache instead of
+    # paying for the same completion again
+    cache = _get_cache()
+    key = _cache_key(definition)
+    if key in cache:
+        return cache[key]
+
+    # Tokenize the original once up front; verification (and any retry)
+    # only has to tokenize the formatted side
+    if original_words is None:
+        original_words = tokenize(definition)
+
     try:
-        response = client.chat.completions.create(
+        response = await create_with_retry(
+            client,
             model=MODEL,
             messages=[
-                {"role": "system", "content": "You are a helpful assistant that formats text by adding newlines for readability. You never change the actual words or content, only add line breaks. Never add the word itself to the beginning of the definition."},
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": prompt}
             ],
             temperature=0.3,  # Lower temperature for more consistent formatting
@@ -137,48 +246,45 @@ Identify: What is the essential definition, and what is supporting illustration?
         
         # Remove any markdown formatting or quotes if present
         formatted = formatted.strip('"\'`')
-        formatted = re.sub(r'^```[\w]*\n?', '', formatted, flags=re.MULTILINE)
-        formatted = re.sub(r'\n?```$', '', formatted, flags=re.MULTILINE)
+        formatted = _FENCE_OPEN.sub('', formatted)
+        formatted = _FENCE_CLOSE.sub('', formatted)
         formatted = formatted.strip()
         
         # Convert literal \n strings to actual newlines if present
         formatted = formatted.replace('\\n', '\n')
         
         # Verify the text hasn't changed
-        if not verify_text_unchanged(definition, formatted):
+        if not verify_text_unchanged(original_words, formatted):
             print(f"    WARNING: Text verification failed! Returning original.")
             print(f"    Original: {definition}...")
             print(f"    Formatted: {formatted}...")
             return definition
         
+        cache[key] = formatted
         return formatted
     
     except Exception as e:
         print(f"    Error formatting definition: {e}")
         return definition
 
-def process_words(words: List[Dict], api_key: str, output_file: str):
-    """Process words and format definitions."""
-    client = OpenAI(api_key=api_key)
+async def process_words(words: List[Dict], api_key: str, output_file: str, concurrency: int = MAX_CONCURRENCY):
+    """Process words and format definitions, keeping several API calls in flight."""
+    client = AsyncOpenAI(api_key=api_key)
     
-    # Check if output file exists and load it to preserve progress
+    # Check if output file exists and load it to preserve progress.
+    # (The old check here or'd an os.path.exists with a bare Path object,
+    # which is always truthy - resolve_path makes the intent explicit.)
     existing_dict = {}
-    if os.path.exists(output_file) or Path("backend") / output_file:
-        json_path = Path(output_file)
-        if not json_path.exists():
-            json_path = Path("backend") / output_file
-        if json_path.exists():
-            existing_words = load_json(output_file)
-            # Create a dictionary for quick lookup by word name
-            existing_dict = {word.get('Word', ''): word for word in existing_words if word.get('Word')}
-            print(f"Found existing file with {len(existing_words)} words. Resuming from where we left off...")
+    if resolve_path(output_file) is not None:
+        existing_words = load_json(output_file)
+        # Create a dictionary for quick lookup by word name
+        existing_dict = {word.get('Word', ''): word for word in existing_words if word.get('Word')}
+        print(f"Found existing file with {len(existing_words)} words. Resuming from where we left off...")
     
     # Create backup before processing
     if not Path(BACKUP_JSON).exists():
-        json_path = Path(INPUT_JSON)
-        if not json_path.exists():
-            json_path = Path("backend") / INPUT_JSON
-        if json_path.exists():
+        json_path = resolve_path(INPUT_JSON)
+        if json_path is not None:
             backup_path = Path(BACKUP_JSON)
             with open(json_path, 'r', encoding='utf-8') as f_in:
                 with open(backup_path, 'w', encoding='utf-8') as f_out:
@@ -189,13 +295,15 @@ def process_words(words: List[Dict], api_key: str, output_file: str):
     total = len(words)
     processed = 0
     skipped = 0
+    trivial = 0
     formatted = 0
     unchanged = 0
     
-    # Start with existing words or create new list
+    # Start with existing words or create new list, filtering out the
+    # words that still need an API call up front
     all_words = []
+    pending = []
     
-    # Process each word
     for word in words:
         word_name = word.get('Word', '')
         if not word_name:
@@ -218,38 +326,86 @@ def process_words(words: List[Dict], api_key: str, output_file: str):
                 print(f"[{len(all_words)}/{total}] Skipping {word_name} (already formatted)")
                 continue
         
-        # Word needs processing
-        print(f"[{len(all_words) + 1}/{total}] Processing {word_name}...")
-        
-        # Format definition
-        formatted_def = format_definition(client, word_name, definition)
-        
-        if formatted_def != definition:
-            word['Definition'] = formatted_def
-            print(f"  Formatted definition (added newlines)")
-            formatted += 1
-        else:
-            print(f"  Definition unchanged (no formatting needed)")
-            unchanged += 1
+        # A short definition with no break punctuation has nothing to
+        # split - the model would return it unchanged, so skip the call.
+        # The token list doubles as the verification baseline, so each
+        # definition is tokenized exactly once.
+        tokens = tokenize(definition)
+        if len(tokens) < TRIVIAL_WORD_COUNT and not any(m in definition for m in BREAK_MARKERS):
+            all_words.append(word)
+            trivial += 1
+            continue
         
-        # Add to all_words list
         all_words.append(word)
-        processed += 1
-        
-        # Save progress after each word
+        pending.append((word, tokens))
+    
+    # Format pending definitions concurrently, bounded by a semaphore so
+    # at most `concurrency` requests are in flight. Rewriting the whole
+    # file per word was O(N^2), so progress is saved only every
+    # SAVE_EVERY words, on Ctrl-C, and at the end.
+    sem = asyncio.Semaphore(concurrency)
+    
+    async def worker(word: Dict, tokens: List[str]) -> str:
+        async with sem:
+            return await format_definition(client, word['Word'], word['Definition'], tokens)
+    
+    since_last_save = 0
+    stop_requested = False
+    
+    def request_stop(signum, frame):
+        nonlocal stop_requested
+        stop_requested = True
+        print("\nInterrupted - finishing the current wave and saving...")
+    
+    previous_handler = signal.signal(signal.SIGINT, request_stop)
+    
+    try:
+        for start in range(0, len(pending), concurrency):
+            wave = pending[start:start + concurrency]
+            print(f"Processing {', '.join(w['Word'] for w, _ in wave)}...")
+            results = await asyncio.gather(*(worker(w, t) for w, t in wave), return_exceptions=True)
+            
+            for (word, _), formatted_def in zip(wave, results):
+                if isinstance(formatted_def, Exception):
+                    print(f"  {word['Word']}: failed ({formatted_def}), keeping original")
+                    unchanged += 1
+                elif formatted_def != word['Definition']:
+                    word['Definition'] = formatted_def
+                    print(f"  {word['Word']}: formatted definition (added newlines)")
+                    formatted += 1
+                else:
+                    print(f"  {word['Word']}: definition unchanged (no formatting needed)")
+                    unchanged += 1
+                processed += 1
+            
+            since_last_save += len(wave)
+            if since_last_save >= SAVE_EVERY:
+                save_json(all_words, output_file)
+                since_last_save = 0
+            
+            if stop_requested:
+                break
+    finally:
+        # Always flush whatever was processed, even on Ctrl-C or a crash
+        signal.signal(signal.SIGINT, previous_handler)
         save_json(all_words, output_file)
-        
-        # Rate limiting - be respectful to the API    
+    
     print(f"\n{'='*50}")
     print(f"Processing complete!")
     print(f"Total words: {total}")
     print(f"Processed: {processed}")
     print(f"Formatted (newlines added): {formatted}")
     print(f"Unchanged (no formatting needed): {unchanged}")
+    print(f"Skipped (too short to need formatting): {trivial}")
     print(f"Skipped (already formatted): {skipped}")
     print(f"Output saved to: {output_file}")
 
 def main():
+    parser = argparse.ArgumentParser(description="Format dictionary definitions with newlines.")
+    parser.add_argument('--concurrency', type=int, default=MAX_CONCURRENCY,
+                        help="Number of OpenAI requests kept in flight at once")
+    args = parser.parse_args()
+    
     print("Dictionary of Obscure Sorrows - Definition Formatter")
     print("=" * 60)
     
@@ -271,7 +427,7 @@ def main():
     print(f"Loaded {len(words)} words")
     
     # Process words
-    process_words(words, api_key, OUTPUT_JSON)
+    asyncio.run(process_words(words, api_key, OUTPUT_JSON, concurrency=args.concurrency))
 
 if __name__ == '__main__':
     main()
@@ -4,14 +4,25 @@ Script to extract all words and definitions from The Dictionary of Obscure Sorro
 and save them to a CSV file.
 """
 
-import requests
-from bs4 import BeautifulSoup
+import asyncio
+import httpx
+from bs4 import BeautifulSoup, SoupStrainer
 import json
-import time
 import re
 from urllib.parse import urljoin, urlparse
 
-def get_word_definition(word_url, base_url):
+MAX_CONCURRENT_FETCHES = 10  # Word pages fetched in parallel (stay polite)
+
+# Precompiled patterns (applied to every scraped word page)
+_POS_DEFINITION = re.compile(r'[a-z]+\.\s*(.+)', re.IGNORECASE)
+_POS_SPLIT = re.compile(r'\b(n|v|adj|adv)\.\s*', re.IGNORECASE)
+_POS_PREFIX = re.compile(r'^[a-z]+\.\s*', re.IGNORECASE)
+_LEADING_ARTIFACT = re.compile(r'^(he|e|t|th|the)\s+', re.IGNORECASE)
+
+# The word listing pages are only mined for links, so parse nothing else
+_LINKS_ONLY = SoupStrainer('a', href=True)
+
+async def get_word_definition(client, word_url, base_url):
     """
     Fetch a single word page and extract its definition and metadata.
     Returns a tuple: (word_name, definition, part_of_speech, etymology, chapter, concept, tags)
@@ -20,11 +31,10 @@ def get_word_definition(word_url, base_url):
         if not word_url.startswith('http'):
             word_url = urljoin(base_url, word_url)
         
-        response = requests.get(word_url, timeout=10)
+        response = await client.get(word_url)
         response.raise_for_status()
-        # Ensure proper encoding handling
-        response.encoding = response.apparent_encoding or 'utf-8'
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # lxml parses raw bytes several times faster than html.parser
+        soup = BeautifulSoup(response.content, 'lxml')
         
         # Find the word name - try multiple methods
         word_name = None
@@ -60,28 +70,28 @@ def get_word_definition(word_url, base_url):
                 full_text = wrapper_elem.get_text(strip=True)
                 # Try to find the definition part (usually after "n." or similar)
                 # Look for pattern like "Wordn. definition" or "Word n. definition"
-                match = re.search(r'[a-z]+\.\s*(.+)', full_text, re.IGNORECASE)
+                match = _POS_DEFINITION.search(full_text)
                 if match:
                     definition = match.group(1).strip()
                 else:
                     # Fallback: take everything after first sentence that looks like part of speech
-                    parts = re.split(r'\b(n|v|adj|adv)\.\s*', full_text, maxsplit=1, flags=re.IGNORECASE)
+                    parts = _POS_SPLIT.split(full_text, maxsplit=1)
                     if len(parts) > 2:
                         definition = parts[-1].strip()
         
         # Clean up definition - remove any leading word name or artifacts
         if definition:
             # Remove part of speech markers at start (n., v., adj., adv., etc.)
-            definition = re.sub(r'^[a-z]+\.\s*', '', definition, flags=re.IGNORECASE).strip()
+            definition = _POS_PREFIX.sub('', definition).strip()
             # Remove common leading artifacts like "he ", "e ", "t ", etc. that might be from word name
-            definition = re.sub(r'^(he|e|t|th|the)\s+', '', definition, flags=re.IGNORECASE).strip()
+            definition = _LEADING_ARTIFACT.sub('', definition).strip()
             # Remove word name if it appears at the start (case-insensitive)
             if word_name:
                 word_lower = word_name.lower()
                 if definition.lower().startswith(word_lower):
                     definition = definition[len(word_name):].strip()
                     # Remove any remaining part of speech after word name
-                    definition = re.sub(r'^[a-z]+\.\s*', '', definition, flags=re.IGNORECASE).strip()
+                    definition = _POS_PREFIX.sub('', definition).strip()
         
         # Extract metadata
         # Part of speech
@@ -133,7 +143,7 @@ def get_word_definition(word_url, base_url):
         print(f"  Error fetching {word_url}: {e}")
         return None
 
-def get_all_words():
+async def get_all_words():
     """
     Scrape all words and definitions from the Dictionary of Obscure Sorrows website.
     Handles pagination to get all words.
@@ -142,8 +152,21 @@ def get_all_words():
     words_url = f'{base_url}/words'
     
     all_word_links = []
+    seen_hrefs = set()  # O(1) dedup instead of rescanning all_word_links per link
     page = 1
     
+    # One shared client: keep-alive connections are reused across all
+    # page fetches instead of paying a TCP+TLS handshake per request
+    client = httpx.AsyncClient(
+        timeout=10,
+        follow_redirects=True,
+        headers={'User-Agent': 'obscure-sorrows-scraper/1.0'},
+        limits=httpx.Limits(
+            max_connections=MAX_CONCURRENT_FETCHES,
+            max_keepalive_connections=MAX_CONCURRENT_FETCHES,
+        ),
+    )
+    
     # Collect word links from all pages
     while True:
         if page == 1:
@@ -154,15 +177,13 @@ def get_all_words():
         print(f"Fetching words list from page {page}...")
         
         try:
-            response = requests.get(current_url, timeout=10)
+            response = await client.get(current_url)
             response.raise_for_status()
-            # Ensure proper encoding handling
-            response.encoding = response.apparent_encoding or 'utf-8'
-        except requests.RequestException as e:
+        except httpx.HTTPError as e:
             print(f"Error fetching page {page}: {e}")
             break
         
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(response.content, 'lxml', parse_only=_LINKS_ONLY)
         
         # Find all links to word pages (links with href starting with /word/)
         page_word_links = []
@@ -170,12 +191,13 @@ def get_all_words():
         
         for link in links:
             href = link.get('href', '')
-            if href.startswith('/word/') and href not in [w[1] for w in all_word_links]:
+            if href.startswith('/word/') and href not in seen_hrefs:
                 # Extract word name from link text or href
                 word_text = link.get_text(strip=True)
                 # Skip if it's empty or too long (likely not a word name)
                 if word_text and len(word_text) < 100:
                     page_word_links.append((word_text, href))
+                    seen_hrefs.add(href)
         
         if not page_word_links:
             # No more words found, we've reached the end
@@ -190,24 +212,48 @@ def get_all_words():
             break
         
         page += 1
-        time.sleep(0.5)  # Be respectful between page requests
+        await asyncio.sleep(0.5)  # Be respectful between page requests
     
     print(f"\nFound {len(all_word_links)} total word links across {page} page(s)")
     
-    # Visit each word page to get the definition and metadata
-    words_data = []
+    # Visit the word pages concurrently: a semaphore caps the number of
+    # requests in flight and a short sleep spaces them out, so the whole
+    # crawl overlaps network latency instead of waiting serially
     print("Fetching definitions and metadata from individual word pages...")
-    for i, (word_text, word_href) in enumerate(all_word_links, 1):
-        print(f"  [{i}/{len(all_word_links)}] Fetching {word_href}...", end='\r')
-        result = get_word_definition(word_href, base_url)
-        if result:
-            words_data.append(result)
-        # Be respectful with rate limiting
-        time.sleep(0.3)
+    sem = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+    completed = 0
+    
+    async def fetch(word_href):
+        nonlocal completed
+        async with sem:
+            await asyncio.sleep(0.05)
+            result = await get_word_definition(client, word_href, base_url)
+        completed += 1
+        print(f"  [{completed}/{len(all_word_links)}] Fetched {word_href}", end='\r')
+        return result
+    
+    try:
+        results = await asyncio.gather(*(fetch(word_href) for _, word_href in all_word_links))
+    finally:
+        await client.aclose()
+    
+    words_data = [result for result in results if result]
     
     print(f"\nSuccessfully extracted {len(words_data)} words with definitions and metadata")
     return words_data
 
+# Replace smart quotes and apostrophes with standard ASCII equivalents,
+# built once so fix_encoding_text is a single C-level pass per string
+_ENCODING_TABLE = str.maketrans({
+    '\u2019': "'",  # right single quotation mark/apostrophe
+    '\u2018': "'",  # left single quotation mark
+    '\u201C': '"',  # left double quotation mark
+    '\u201D': '"',  # right double quotation mark
+    '\u2014': '—',  # em dash
+    '\u2013': '–',  # en dash
+    '\u2026': '…',  # ellipsis
+})
+
 def fix_encoding_text(text: str) -> str:
     """
     Fix common encoding issues in text.
@@ -216,22 +262,7 @@ def fix_encoding_text(text: str) -> str:
     if not text:
         return text
     
-    # Replace smart quotes and apostrophes with standard ASCII equivalents
-    replacements = {
-        '\u2019': "'",  # right single quotation mark/apostrophe
-        '\u2018': "'",  # left single quotation mark
-        '\u201C': '"',  # left double quotation mark
-        '\u201D': '"',  # right double quotation mark
-        '\u2014': '—',  # em dash
-        '\u2013': '–',  # en dash
-        '\u2026': '…',  # ellipsis
-    }
-    
-    fixed = text
-    for unicode_char, ascii_char in replacements.items():
-        fixed = fixed.replace(unicode_char, ascii_char)
-    
-    return fixed
+    return text.translate(_ENCODING_TABLE)
 
 def save_to_json(words_data, filename='obscure_sorrows_dictionary.json'):
     """
@@ -279,7 +310,7 @@ def main():
     print("Dictionary of Obscure Sorrows - CSV Extractor")
     print("=" * 50)
     
-    words_data = get_all_words()
+    words_data = asyncio.run(get_all_words())
     
     if words_data:
         save_to_json(words_data)
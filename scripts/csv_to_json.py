@@ -8,26 +8,39 @@ import json
 import sys
 from pathlib import Path
 
+# orjson serializes several times faster than stdlib json; optional
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 def csv_to_json(csv_file: str, json_file: str = None) -> None:
     """Convert CSV to JSON format."""
     if json_file is None:
         json_file = csv_file.replace('.csv', '.json')
     
-    print(f"Reading CSV from {csv_file}...")
-    
-    words = []
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            words.append(row)
-    
-    print(f"Loaded {len(words)} words")
+    print(f"Converting {csv_file} to {json_file}...")
     
-    print(f"Writing JSON to {json_file}...")
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(words, f, ensure_ascii=False, indent=2)
+    # Stream rows straight from the CSV reader into the JSON array, so
+    # memory stays O(1) row instead of holding every row plus the full
+    # serialized document
+    count = 0
+    # 1 MiB output buffer: the per-row writes coalesce into large syscalls
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f_in, \
+            open(json_file, 'wb', buffering=1 << 20) as f_out:
+        f_out.write(b'[\n')
+        for row in csv.DictReader(f_in):
+            if count:
+                f_out.write(b',\n')
+            if HAS_ORJSON:
+                f_out.write(orjson.dumps(row, option=orjson.OPT_INDENT_2))
+            else:
+                f_out.write(json.dumps(row, ensure_ascii=False, indent=2).encode('utf-8'))
+            count += 1
+        f_out.write(b'\n]\n')
     
-    print(f"Successfully converted to {json_file}")
+    print(f"Successfully converted {count} words to {json_file}")
 
 if __name__ == '__main__':
     if len(sys.argv) < 2:
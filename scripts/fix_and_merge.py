@@ -7,15 +7,28 @@ Fix and merge dictionary data:
 - Save to dictionary.json
 """
 
+import asyncio
 import json
 import os
 import sys
 from pathlib import Path
 
-# Import the sentence generation function
+# orjson serializes several times faster than stdlib json; optional
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# Import the sentence generation machinery
 sys.path.insert(0, str(Path(__file__).parent))
-from add_example_sentences import get_example_sentences
-from openai import OpenAI
+from add_example_sentences import (
+    BATCH_THRESHOLD,
+    MAX_CONCURRENCY,
+    get_example_sentences,
+    make_client,
+    run_batch,
+)
 
 SCRAPED_JSON = 'obscure_sorrows_dictionary.json'
 EXISTING_JSON = 'obscure_sorrows_dictionary_with_sentences.json'
@@ -34,16 +47,24 @@ def load_json(filename: str) -> list:
         print(f"Error: {filename} not found!")
         return []
     
+    if HAS_ORJSON:
+        # orjson parses the raw bytes directly, skipping the text decode
+        return orjson.loads(Path(filename).read_bytes())
     with open(filename, 'r', encoding='utf-8') as f:
         return json.load(f)
 
 def save_json(data: list, filename: str):
     """Save data to JSON file."""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if HAS_ORJSON:
+        Path(filename).write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        # 1 MiB buffer collapses json.dump's many tiny writes into a few
+        # large syscalls
+        with open(filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
     print(f"Saved {len(data)} words to {filename}")
 
-def main():
+async def main():
     print("Dictionary of Obscure Sorrows - Fix and Merge")
     print("=" * 60)
     
@@ -79,7 +100,7 @@ def main():
     client = None
     if api_key:
         try:
-            client = OpenAI(api_key=api_key)
+            client = make_client(api_key)
             print("OpenAI client initialized")
         except Exception as e:
             print(f"Warning: Could not initialize OpenAI client: {e}")
@@ -88,6 +109,7 @@ def main():
     # Merge data
     print(f"\nMerging data...")
     merged_words = []
+    to_regenerate = []
     regenerated = 0
     used_existing = 0
     missing = 0
@@ -97,37 +119,12 @@ def main():
         if not word_name:
             continue
         
-        # Get sentences from existing data
-        sentences = existing_by_word.get(word_name, '').strip()
+        # Get sentences from existing data (stripped once at build time)
+        sentences = existing_by_word.get(word_name, '')
         
         # Check if sentences are valid (at least MIN_SENTENCE_WORDS words)
         word_count = count_words(sentences)
         
-        if word_count < MIN_SENTENCE_WORDS:
-            # Sentences are too short, regenerate them
-            print(f"[{idx}/{len(scraped_words)}] {word_name}: Sentences too short ({word_count} words), regenerating...")
-            
-            if client:
-                definition = scraped_word.get('Definition', '')
-                new_sentences = get_example_sentences(client, word_name, definition, num_sentences=3)
-                if new_sentences and count_words(new_sentences) >= MIN_SENTENCE_WORDS:
-                    sentences = new_sentences
-                    regenerated += 1
-                    print(f"  ✓ Regenerated sentences ({count_words(sentences)} words)")
-                else:
-                    print(f"  ✗ Failed to generate valid sentences")
-                    sentences = ""
-                    missing += 1
-            else:
-                print(f"  ✗ No API key available, skipping regeneration")
-                sentences = ""
-                missing += 1
-        else:
-            # Use existing sentences
-            used_existing += 1
-            if idx % 50 == 0:
-                print(f"[{idx}/{len(scraped_words)}] {word_name}: Using existing sentences ({word_count} words)")
-        
         # Create merged word entry
         merged_word = {
             'Word': scraped_word.get('Word', ''),
@@ -140,6 +137,46 @@ def main():
             'Example Sentences': sentences,
         }
         merged_words.append(merged_word)
+        
+        if word_count < MIN_SENTENCE_WORDS:
+            # Too short: queue for one regeneration pass after the merge
+            print(f"[{idx}/{len(scraped_words)}] {word_name}: Sentences too short ({word_count} words), queued for regeneration")
+            merged_word['Example Sentences'] = ''
+            to_regenerate.append(merged_word)
+        else:
+            # Use existing sentences
+            used_existing += 1
+            if idx % 50 == 0:
+                print(f"[{idx}/{len(scraped_words)}] {word_name}: Using existing sentences ({word_count} words)")
+    
+    # Regenerate the queued words in one go: a Batch API job for large
+    # runs (half cost, separate rate limits), concurrent realtime calls
+    # for small reruns
+    if to_regenerate and client:
+        print(f"\nRegenerating sentences for {len(to_regenerate)} words...")
+        if len(to_regenerate) >= BATCH_THRESHOLD:
+            results = await run_batch(client, to_regenerate)
+        else:
+            sem = asyncio.Semaphore(MAX_CONCURRENCY)
+            
+            async def worker(word):
+                async with sem:
+                    sentences = await get_example_sentences(client, word['Word'], word['Definition'], num_sentences=3)
+                return word['Word'], sentences
+            
+            results = dict(await asyncio.gather(*(worker(word) for word in to_regenerate)))
+        
+        for merged_word in to_regenerate:
+            new_sentences = (results.get(merged_word['Word']) or '').strip()
+            if count_words(new_sentences) >= MIN_SENTENCE_WORDS:
+                merged_word['Example Sentences'] = new_sentences
+                regenerated += 1
+            else:
+                print(f"  ✗ {merged_word['Word']}: failed to generate valid sentences")
+                missing += 1
+    elif to_regenerate:
+        print(f"\n✗ No API key available, skipping regeneration of {len(to_regenerate)} words")
+        missing += len(to_regenerate)
     
     # Save merged data
     print(f"\nSaving merged data to {OUTPUT_JSON}...")
@@ -154,5 +191,5 @@ def main():
     print(f"Output saved to: {OUTPUT_JSON}")
 
 if __name__ == '__main__':
-    main()
+    asyncio.run(main())
 
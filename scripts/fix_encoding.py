@@ -5,7 +5,10 @@ that were incorrectly decoded.
 """
 
 import csv
+import os
+import re
 import sys
+import tempfile
 from pathlib import Path
 
 try:
@@ -16,46 +19,61 @@ except ImportError:
     print("Warning: ftfy not installed. Install with: pip install ftfy")
     print("  Will use basic fixes instead.")
 
+# Common encoding issues:
+# â€™ -> ' (right single quotation mark/apostrophe)
+# â€˜ -> ' (left single quotation mark)
+# â€œ -> " (left double quotation mark)
+# â€ -> " (right double quotation mark)
+# â€" -> — (em dash)
+# â€¦ -> … (ellipsis)
+# (The old replacement dict listed the em/en dash pattern several times;
+# identical keys silently collapse, so only one entry is kept here.)
+_MOJIBAKE = {
+    'â€™': "'",
+    'â€˜': "'",
+    'â€œ': '"',
+    'â€¦': '…',
+    'â€"': '—',
+    'â€': '"',
+}
+
+# One alternation pattern so every substitution happens in a single scan
+# instead of one full pass per replacement; longest patterns first so
+# e.g. â€™ wins over its â€ prefix
+_MOJIBAKE_RE = re.compile('|'.join(
+    re.escape(pattern) for pattern in sorted(_MOJIBAKE, key=len, reverse=True)
+))
+
+# After mojibake repair the text can still carry curly quotes (ftfy in
+# particular restores them as proper Unicode). Straighten those in one
+# C-level translate pass, the same normalization the scraper applies;
+# em dashes and ellipses are kept as-is because downstream definition
+# formatting keys on them.
+_POST_TABLE = str.maketrans({
+    '\u2019': "'",  # right single quotation mark/apostrophe
+    '\u2018': "'",  # left single quotation mark
+    '\u201C': '"',  # left double quotation mark
+    '\u201D': '"',  # right double quotation mark
+})
+
 def fix_encoding_text(text: str) -> str:
     """
     Fix common encoding issues in text.
     Replaces incorrectly decoded smart quotes and apostrophes with standard ones.
     """
-    if not text:
+    # Pure-ASCII text (the vast majority of cells) can't contain
+    # mojibake; isascii() is an O(1) flag check on CPython
+    if not text or text.isascii():
         return text
     
-    # Common encoding issues:
-    # â€™ -> ' (right single quotation mark/apostrophe)
-    # â€œ -> " (left double quotation mark)
-    # â€ -> " (right double quotation mark)
-    # â€" -> — (em dash)
-    # â€" -> – (en dash)
-    # â€¦ -> … (ellipsis)
-    
-    replacements = {
-        'â€™': "'",
-        'â€œ': '"',
-        'â€': '"',
-        'â€"': '—',
-        'â€"': '–',
-        'â€¦': '…',
-        'â€˜': "'",  # left single quotation mark
-        'â€"': '—',  # em dash (alternative encoding)
-        'â€"': '–',  # en dash (alternative encoding)
-    }
-    
-    fixed = text
-    for wrong, correct in replacements.items():
-        fixed = fixed.replace(wrong, correct)
-    
-    return fixed
+    return _MOJIBAKE_RE.sub(lambda m: _MOJIBAKE[m.group(0)], text).translate(_POST_TABLE)
 
 def fix_encoding_text_advanced(text: str) -> str:
     """
     Advanced fix for encoding issues.
     Handles the case where UTF-8 bytes were interpreted as Windows-1252.
     """
-    if not text:
+    if not text or text.isascii():
         return text
     
     # Use ftfy if available (best solution)
@@ -68,8 +86,9 @@ def fix_encoding_text_advanced(text: str) -> str:
     # The pattern "â€™" represents UTF-8 bytes E2 80 99 (right single quote) 
     # that were interpreted as Windows-1252 characters
     try:
-        # If the text contains these patterns, it was likely mis-encoded
-        if 'â€™' in text or 'â€œ' in text or 'â€' in text:
+        # All the mojibake patterns share the 'â€' prefix, so one
+        # substring scan answers what the old three probes did
+        if 'â€' in text:
             # Encode as Windows-1252 to get original bytes
             text_bytes = text.encode('windows-1252', errors='ignore')
             # Decode as UTF-8 to get correct characters
@@ -83,7 +102,10 @@ def fix_encoding_text_advanced(text: str) -> str:
 def fix_csv_file(input_file: str, output_file: str = None) -> None:
     """
     Fix encoding issues in a CSV file.
-    Reads file as binary first to properly handle encoding conversion.
+    Streams the file row by row, so memory stays O(row) rather than
+    O(file): each cell is fixed individually (ftfy handles mis-decoded
+    UTF-8 per cell) and written straight to a temp file that atomically
+    replaces the output at the end.
     """
     input_path = Path(input_file)
     if not input_path.exists():
@@ -95,55 +117,33 @@ def fix_csv_file(input_file: str, output_file: str = None) -> None:
     
     print(f"Fixing encoding in {input_file}...")
     
-    # Read file as binary first
-    with open(input_file, 'rb') as f:
-        raw_bytes = f.read()
-    
-    # Use ftfy if available (handles this automatically)
-    if HAS_FTFY:
-        # Decode as UTF-8 (or whatever it claims to be) and let ftfy fix it
-        try:
-            content = raw_bytes.decode('utf-8')
-        except UnicodeDecodeError:
-            content = raw_bytes.decode('utf-8', errors='replace')
-        content = ftfy.fix_text(content)
-    else:
-        # Manual fix: Try to decode as UTF-8 first
-        try:
-            content = raw_bytes.decode('utf-8')
-            # Check if it has the mis-encoding pattern
-            if 'â€™' in content or 'â€œ' in content:
-                # Re-encode as Windows-1252 then decode as UTF-8
-                print("  Detected mis-encoded UTF-8, fixing...")
-                content = raw_bytes.decode('windows-1252').encode('latin1').decode('utf-8')
-        except (UnicodeDecodeError, UnicodeEncodeError):
-            # If UTF-8 fails, try Windows-1252
-            try:
-                content = raw_bytes.decode('windows-1252')
-                # Then try to fix by re-encoding
-                content = content.encode('latin1').decode('utf-8', errors='replace')
-            except (UnicodeDecodeError, UnicodeEncodeError):
-                # Last resort: read as UTF-8 with error replacement
-                content = raw_bytes.decode('utf-8', errors='replace')
-    
-    # Parse CSV from the fixed content
-    import io
-    rows = []
-    reader = csv.reader(io.StringIO(content))
-    header = next(reader)
-    rows.append(header)
-    
-    for row in reader:
-        fixed_row = [fix_encoding_text_advanced(cell) for cell in row]
-        rows.append(fixed_row)
-    
-    # Write back as proper UTF-8
-    with open(output_file, 'w', newline='', encoding='utf-8') as f:
-        writer = csv.writer(f)
-        writer.writerows(rows)
+    # Write to a temp file in the same directory so os.replace stays on
+    # one filesystem and the output is never left half-written
+    output_path = Path(output_file)
+    tmp = tempfile.NamedTemporaryFile(
+        'w', newline='', encoding='utf-8', delete=False,
+        dir=output_path.parent, suffix='.tmp'
+    )
+    row_count = 0
+    try:
+        with open(input_file, 'r', encoding='utf-8', newline='', errors='replace') as f_in, tmp:
+            reader = csv.reader(f_in)
+            writer = csv.writer(tmp)
+            
+            header = next(reader, None)
+            if header is not None:
+                writer.writerow(header)
+            
+            for row in reader:
+                writer.writerow([fix_encoding_text_advanced(cell) for cell in row])
+                row_count += 1
+        os.replace(tmp.name, output_file)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
     
     print(f"Fixed encoding and saved to {output_file}")
-    print(f"Processed {len(rows) - 1} data rows (plus header)")
+    print(f"Processed {row_count} data rows (plus header)")
 
 def main():
     if len(sys.argv) < 2:
@@ -4,63 +4,65 @@ Fix non-English characters in example sentences.
 Iterates through dictionary.json and regenerates sentences that contain non-English characters.
 """
 
+import asyncio
 import json
 import os
-import re
 import sys
 from pathlib import Path
 
 # Import the sentence generation function
 sys.path.insert(0, str(Path(__file__).parent))
-from add_example_sentences import get_example_sentences
-from openai import OpenAI
+from add_example_sentences import (
+    MAX_CONCURRENCY, _cache_key, _get_cache, get_example_sentences, make_client
+)
 
 INPUT_JSON = 'dictionary.json'
 OUTPUT_JSON = 'dictionary.json'
 
+# ijson streams records one at a time instead of parsing the whole file;
+# fall back to json.load when it is not installed
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
 # Common non-English characters that indicate non-English text
 # German: ä, ö, ü, ß
 # French: é, è, ê, ë, à, â, ç, ô, ù, û, ÿ
 # Spanish: á, é, í, ó, ú, ñ, ¿, ¡
 # And other accented characters
-NON_ENGLISH_PATTERN = re.compile(
-    r'[äöüßáàâäéèêëíìîïóòôöúùûüýÿñç]|'
-    r'[ÄÖÜÁÀÂÄÉÈÊËÍÌÎÏÓÒÔÖÚÙÛÜÝŸÑÇ]|'
-    r'[¿¡]'
+NON_ENGLISH_CHARS = frozenset(
+    'äöüßáàâéèêëíìîïóòôúùûüýÿñç'
+    'ÄÖÜÁÀÂÉÈÊËÍÌÎÏÓÒÔÖÚÙÛÜÝŸÑÇ'
+    '¿¡'
 )
 
 def has_non_english(text: str) -> bool:
     """Check if text contains non-English characters."""
     if not text:
         return False
-    return bool(NON_ENGLISH_PATTERN.search(text))
-
-def load_json(filename: str) -> list:
-    """Load JSON file."""
-    if not os.path.exists(filename):
-        print(f"Error: {filename} not found!")
-        return []
-    
-    with open(filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    # Plain ASCII (almost every sentence) short-circuits via the O(1)
+    # isascii() flag; only non-ASCII text pays for the membership scan
+    return not text.isascii() and any(c in NON_ENGLISH_CHARS for c in text)
 
-def save_json(data: list, filename: str):
-    """Save data to JSON file."""
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-    print(f"Saved {len(data)} words to {filename}")
+def iter_words(json_path: Path):
+    """Yield word records from the JSON array one at a time."""
+    if HAS_IJSON:
+        with open(json_path, 'rb') as f:
+            yield from ijson.items(f, 'item')
+    else:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
 
-def main():
+async def main():
     print("Dictionary of Obscure Sorrows - Fix Non-English Sentences")
     print("=" * 60)
     
-    # Load dictionary
-    print(f"\nLoading dictionary from {INPUT_JSON}...")
-    words = load_json(INPUT_JSON)
-    if not words:
-        print("No words found!")
+    json_path = Path(INPUT_JSON)
+    if not json_path.exists():
+        print(f"Error: {INPUT_JSON} not found!")
         return
-    print(f"Loaded {len(words)} words")
     
     # Check for API key
     api_key = os.getenv('OPENAI_API_KEY')
@@ -72,19 +74,26 @@ def main():
         return
     
     try:
-        client = OpenAI(api_key=api_key)
+        client = make_client(api_key)
         print("OpenAI client initialized")
     except Exception as e:
         print(f"Error: Could not initialize OpenAI client: {e}")
         return
     
-    # Check and fix sentences
+    # First pass: stream the dictionary and queue only the offending
+    # words, so memory holds one record plus the (small) fix queue
+    # instead of the whole file. The fixes run concurrently afterwards:
+    # each is an independent HTTP round-trip, so a bounded gather
+    # collapses wall time from one RTT per word to one RTT per wave.
     print(f"\nChecking for non-English characters in sentences...")
     fixed = 0
     skipped = 0
     failed = 0
+    total = 0
+    to_fix = []
     
-    for idx, word in enumerate(words, 1):
+    for idx, word in enumerate(iter_words(json_path), 1):
+        total = idx
         word_name = word.get('Word', '').strip()
         sentences = word.get('Example Sentences', '').strip()
         
@@ -93,31 +102,75 @@ def main():
         
         # Check if sentences contain non-English characters
         if has_non_english(sentences):
-            print(f"[{idx}/{len(words)}] {word_name}: Found non-English characters, regenerating...")
+            print(f"[{idx}] {word_name}: Found non-English characters, queued for regeneration")
             print(f"  Original: {sentences[:100]}...")
-            
-            definition = word.get('Definition', '')
-            new_sentences = get_example_sentences(client, word_name, definition, num_sentences=3)
-            
-            if new_sentences and not has_non_english(new_sentences):
-                word['Example Sentences'] = new_sentences
-                fixed += 1
-                print(f"  ✓ Fixed: {new_sentences[:100]}...")
-            else:
-                print(f"  ✗ Failed to generate English-only sentences")
-                failed += 1
+            to_fix.append({'Word': word_name, 'Definition': word.get('Definition', '')})
         else:
             skipped += 1
             if idx % 50 == 0:
-                print(f"[{idx}/{len(words)}] {word_name}: OK")
+                print(f"[{idx}] {word_name}: OK")
+    
+    new_sentences_by_word = {}
+    if to_fix:
+        print(f"\nRegenerating sentences for {len(to_fix)} words...")
+        sem = asyncio.Semaphore(MAX_CONCURRENCY)
+        
+        # The bad sentences may themselves be sitting in the shared
+        # response cache, and a hit would hand them back verbatim - so
+        # evict each stale entry first. The fresh result is cached by
+        # get_example_sentences, which keeps reruns after a partial
+        # failure free for the words that were already fixed.
+        cache = _get_cache()
+        
+        async def worker(word):
+            async with sem:
+                key = _cache_key(word['Word'], word['Definition'], 3)
+                if key in cache:
+                    del cache[key]
+                return await get_example_sentences(
+                    client, word['Word'], word['Definition'], num_sentences=3
+                )
+        
+        results = await asyncio.gather(*(worker(word) for word in to_fix), return_exceptions=True)
+        
+        for word, new_sentences in zip(to_fix, results):
+            word_name = word['Word']
+            if isinstance(new_sentences, Exception):
+                print(f"  ✗ {word_name}: failed ({new_sentences})")
+                failed += 1
+            elif new_sentences and not has_non_english(new_sentences):
+                new_sentences_by_word[word_name] = new_sentences
+                fixed += 1
+                print(f"  ✓ {word_name}: {new_sentences[:100]}...")
+            else:
+                print(f"  ✗ {word_name}: failed to generate English-only sentences")
+                failed += 1
     
-    # Save fixed dictionary
+    # Second pass: stream the dictionary again, patch the regenerated
+    # sentences in, and emit each record straight to a temp file that
+    # atomically replaces the output - the full word list is never in
+    # memory at once
     print(f"\nSaving fixed dictionary to {OUTPUT_JSON}...")
-    save_json(words, OUTPUT_JSON)
+    output_path = Path(OUTPUT_JSON)
+    tmp_path = output_path.with_suffix(output_path.suffix + '.tmp')
+    saved = 0
+    with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.write('[\n')
+        for word in iter_words(json_path):
+            word_name = word.get('Word', '').strip()
+            if word_name in new_sentences_by_word:
+                word['Example Sentences'] = new_sentences_by_word[word_name]
+            if saved:
+                f.write(',\n')
+            f.write('  ' + json.dumps(word, ensure_ascii=False))
+            saved += 1
+        f.write('\n]\n')
+    os.replace(tmp_path, output_path)
+    print(f"Saved {saved} words to {OUTPUT_JSON}")
     
     print(f"\n{'='*60}")
     print(f"Fix complete!")
-    print(f"Total words: {len(words)}")
+    print(f"Total words: {total}")
     print(f"Sentences checked: {skipped + fixed + failed}")
     print(f"Fixed (regenerated): {fixed}")
     print(f"Already English: {skipped}")
@@ -125,5 +178,5 @@ def main():
     print(f"Output saved to: {OUTPUT_JSON}")
 
 if __name__ == '__main__':
-    main()
+    asyncio.run(main())
 
@@ -6,8 +6,26 @@ This is much cleaner than building HTML strings manually.
 
 import html
 import json
+import re
 from pathlib import Path
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+# ijson streams records one at a time instead of parsing the whole file;
+# fall back to json.load when it is not installed
+try:
+    import ijson
+    HAS_IJSON = True
+except ImportError:
+    HAS_IJSON = False
+
+def iter_words(json_path):
+    """Yield word records from the JSON array one at a time."""
+    if HAS_IJSON:
+        with open(json_path, 'rb') as f:
+            yield from ijson.items(f, 'item')
+    else:
+        with open(json_path, 'r', encoding='utf-8') as f:
+            yield from json.load(f)
 
 def escape_html(text):
     """Escape HTML special characters."""
@@ -15,23 +33,34 @@ def escape_html(text):
         return ""
     return html.escape(str(text))
 
+# Splitting on the pattern folds the per-item .strip() into the one
+# C-level regex pass
+_SEMI_SPLIT = re.compile(r'\s*;\s*').split
+
 def process_words(words):
     """Process words from JSON, parsing tags and sentences."""
     processed = []
+    _esc = escape_html  # local binding skips a global lookup per field
     for idx, word in enumerate(words, 1):
         word_name = word.get('Word', '')
+        # html.escape already entity-encodes both quote characters, so
+        # one pass produces text that is safe in attribute position too -
+        # the old per-field .replace chain rescanned it for nothing
+        etymology = _esc(word.get('Etymology', ''))
+        tags_raw = (word.get('Tags') or '').strip()
+        sentences_raw = (word.get('Example Sentences') or '').strip()
         processed_word = {
             'index': idx,
-            'word_name': escape_html(word_name),
+            'word_name': _esc(word_name),
             'word_name_lower': word_name.lower(),
-            'definition': escape_html(word.get('Definition', '')),
-            'part_of_speech': escape_html(word.get('Part of Speech', '')),
-            'etymology': escape_html(word.get('Etymology', '')),
-            'etymology_attr': escape_html(word.get('Etymology', '')).replace('"', '&quot;').replace("'", '&#39;'),
-            'chapter': escape_html(word.get('Chapter', '')),
-            'concept': escape_html(word.get('Concept', '')),
-            'tags': [escape_html(tag.strip()) for tag in (word.get('Tags') or '').split(';') if tag.strip()],
-            'sentences': [escape_html(s.strip()) for s in (word.get('Example Sentences') or '').split(';') if s.strip()],
+            'definition': _esc(word.get('Definition', '')),
+            'part_of_speech': _esc(word.get('Part of Speech', '')),
+            'etymology': etymology,
+            'etymology_attr': etymology,
+            'chapter': _esc(word.get('Chapter', '')),
+            'concept': _esc(word.get('Concept', '')),
+            'tags': [_esc(tag) for tag in _SEMI_SPLIT(tags_raw) if tag],
+            'sentences': [_esc(s) for s in _SEMI_SPLIT(sentences_raw) if s],
         }
         processed.append(processed_word)
     return processed
@@ -39,26 +68,26 @@ def process_words(words):
 def generate_html(json_file='dictionary.json', output_file='dictionary.html'):
     """Generate a beautiful single-page HTML website from the JSON using Jinja2 template."""
     
-    # Read the JSON
-    with open(json_file, 'r', encoding='utf-8') as f:
-        words = json.load(f)
-    
-    print(f"Loaded {len(words)} words from {json_file}")
-    
-    # Process words
-    processed_words = process_words(words)
+    # Stream the JSON straight into processing, so only the processed
+    # records are held in memory rather than the raw parse as well
+    processed_words = process_words(iter_words(json_file))
     
-    # Create word mappings for JavaScript
-    word_to_index = {word['word_name_lower']: word['index'] for word in processed_words}
-    index_to_word = {word['index']: word['word_name'] for word in processed_words}
+    print(f"Loaded {len(processed_words)} words from {json_file}")
     
-    # Convert to JSON strings for JavaScript (more reliable than Jinja2 loops)
-    # Use custom formatting to ensure numeric keys in indexToWord
-    word_to_index_js = json.dumps(word_to_index, ensure_ascii=False)
-    # For indexToWord, we need numeric keys, so format manually
-    # Escape quotes in word names for JavaScript
-    index_to_word_items = [f'{k}: {json.dumps(v, ensure_ascii=False)}' for k, v in sorted(index_to_word.items())]
-    index_to_word_js = '{\n            ' + ',\n            '.join(index_to_word_items) + '\n        }'
+    # Create word mappings for JavaScript and serialize them directly
+    # (more reliable than Jinja2 loops). String keys are fine for
+    # indexToWord: JS property access coerces numeric indices to
+    # strings, so indexToWord[5] reads the "5" key. processed_words is
+    # already in ascending index order from enumerate, so the maps come
+    # out ordered without any sort.
+    word_to_index_js = json.dumps(
+        {word['word_name_lower']: word['index'] for word in processed_words},
+        ensure_ascii=False,
+    )
+    index_to_word_js = json.dumps(
+        {str(word['index']): word['word_name'] for word in processed_words},
+        ensure_ascii=False,
+    )
     
     # Load template
     template_path = Path('template.html')
@@ -66,22 +95,28 @@ def generate_html(json_file='dictionary.json', output_file='dictionary.html'):
         print(f"Error: template.html not found. Please create it first.")
         return
     
-    template_content = template_path.read_text(encoding='utf-8')
-    template = Template(template_content)
+    # A bytecode cache lets repeat runs skip recompiling the (large)
+    # template
+    cache_dir = Path('.jinja_cache')
+    cache_dir.mkdir(exist_ok=True)
+    env = Environment(
+        loader=FileSystemLoader(str(template_path.parent) or '.'),
+        bytecode_cache=FileSystemBytecodeCache(str(cache_dir)),
+    )
+    template = env.get_template(template_path.name)
     
-    # Render template
-    html_content = template.render(
+    # Render straight to disk: stream() yields the document in chunks,
+    # so the full multi-MB HTML string is never materialized in memory
+    stream = template.stream(
         words=processed_words,
         total_words=len(processed_words),
         word_to_index_js=word_to_index_js,
         index_to_word_js=index_to_word_js,
     )
+    stream.enable_buffering(100)  # group tiny template chunks per write
+    stream.dump(str(output_file), encoding='utf-8')
     
-    # Write to file
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(html_content)
-    
-    print(f"Generated {output_file} with {len(words)} words")
+    print(f"Generated {output_file} with {len(processed_words)} words")
 
 if __name__ == '__main__':
     generate_html()
@@ -6,9 +6,29 @@ outputting to JSON.
 
 import json
 import csv
+import mmap
 import sys
 from pathlib import Path
 
+# orjson parses and serializes several times faster than stdlib json; optional
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+def _load_json_fast(path: str):
+    """Parse a JSON file; with orjson, decode straight from a memory map.
+
+    The mmap hands orjson the file contents without an intermediate
+    read() copy; stdlib json.load is the fallback.
+    """
+    if HAS_ORJSON:
+        with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return orjson.loads(memoryview(mm))
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
 def merge_to_json(scraped_json: str, existing_data: str, output_json: str = None) -> None:
     """
     Merge scraped JSON data with existing data (CSV or JSON) that has example sentences.
@@ -22,40 +42,51 @@ def merge_to_json(scraped_json: str, existing_data: str, output_json: str = None
         output_json = existing_data.replace('.csv', '.json').replace('.json', '_merged.json')
     
     print(f"Reading scraped data from {scraped_json}...")
-    with open(scraped_json, 'r', encoding='utf-8') as f:
-        scraped_words = json.load(f)
+    scraped_words = _load_json_fast(scraped_json)
     
     print(f"Loaded {len(scraped_words)} words from scraped data")
     
     print(f"Reading existing data from {existing_data}...")
-    # Try to read as JSON first (if it was converted from CSV)
+    # Only the word name and its sentences are needed, so the existing
+    # data is normalized to (word, sentences) pairs up front - the CSV
+    # path resolves the two columns to indices once and reads plain
+    # tuples instead of paying for a fresh dict per row
     existing_json_path = existing_data.replace('.csv', '.json')
     if existing_json_path != existing_data and Path(existing_json_path).exists():
+        # Use the JSON version if it was already converted from CSV
         print(f"Found JSON version at {existing_json_path}, using that instead...")
-        with open(existing_json_path, 'r', encoding='utf-8') as f:
-            existing_words = json.load(f)
+        existing_words = [
+            (
+                word_data.get('Word', ''),
+                word_data.get('Example Sentences', '') or word_data.get('Sentences', '') or ''
+            )
+            for word_data in _load_json_fast(existing_json_path)
+        ]
     else:
-        # Read as CSV - but be smarter about finding sentences
         existing_words = []
-        with open(existing_data, 'r', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
+        with open(existing_data, 'r', encoding='utf-8', newline='') as f:
+            reader = csv.reader(f)
+            header = next(reader, [])
+            word_idx = header.index('Word') if 'Word' in header else None
+            if 'Example Sentences' in header:
+                sentences_idx = header.index('Example Sentences')
+            elif 'Sentences' in header:
+                sentences_idx = header.index('Sentences')
+            else:
+                sentences_idx = None
             for row in reader:
-                existing_words.append(row)
+                existing_words.append((
+                    row[word_idx] if word_idx is not None and word_idx < len(row) else '',
+                    row[sentences_idx] if sentences_idx is not None and sentences_idx < len(row) else '',
+                ))
     
     print(f"Loaded {len(existing_words)} words from existing data")
     
     # Create a mapping by word name for existing data
     existing_by_word = {}
-    for word_data in existing_words:
-        word_name = word_data.get('Word', '').strip()
+    for word_name, sentences in existing_words:
+        word_name = word_name.strip()
         if word_name:
-            # Try to find sentences - check multiple possible field names
-            sentences = (
-                word_data.get('Example Sentences', '') or
-                word_data.get('Example Sentences', '') or
-                word_data.get('Sentences', '') or
-                ''
-            )
             existing_by_word[word_name] = sentences
     
     # Merge: use scraped data for all fields except Example Sentences
@@ -69,12 +100,7 @@ def merge_to_json(scraped_json: str, existing_data: str, output_json: str = None
         
         # If not found by name and we have positional data, try by index
         if not sentences and idx < len(existing_words):
-            existing_word = existing_words[idx]
-            sentences = (
-                existing_word.get('Example Sentences', '') or
-                existing_word.get('Sentences', '') or
-                ''
-            )
+            sentences = existing_words[idx][1]
         
         merged_word = {
             'Word': scraped_word.get('Word', ''),
@@ -88,10 +114,20 @@ def merge_to_json(scraped_json: str, existing_data: str, output_json: str = None
         }
         merged_words.append(merged_word)
     
-    # Write merged data to JSON
+    # Write merged data to JSON, one record per write: json.dump with
+    # indent buffers large intermediate strings, while emitting each
+    # word separately keeps the serialization working set one word big
     print(f"Writing merged data to {output_json}...")
-    with open(output_json, 'w', encoding='utf-8') as f:
-        json.dump(merged_words, f, ensure_ascii=False, indent=2)
+    with open(output_json, 'wb', buffering=1 << 20) as f:
+        f.write(b'[\n')
+        for idx, merged_word in enumerate(merged_words):
+            if idx:
+                f.write(b',\n')
+            if HAS_ORJSON:
+                f.write(orjson.dumps(merged_word))
+            else:
+                f.write(json.dumps(merged_word, ensure_ascii=False).encode('utf-8'))
+        f.write(b'\n]\n')
     
     print(f"Successfully merged {len(merged_words)} words")
     print(f"Output saved to {output_json}")